@@ -51,7 +51,7 @@ async def trigger_process_tasks(background_tasks: BackgroundTasks, db: Session =
     return {"status": "processing", "message": "Processing pending tasks in background"}
 
 @router.post("/extract-information")
-async def extract_information(payload: TextPayload, db: Session = Depends(get_db)):
+def extract_information(payload: TextPayload, db: Session = Depends(get_db)):
     """Extract information from text using AI components"""
     cleaned_text = text_processor.clean_text(payload.text)
     financial_metrics = information_extractor.extract_financial_metrics(cleaned_text)
@@ -68,19 +68,19 @@ async def extract_information(payload: TextPayload, db: Session = Depends(get_db
     }
 
 @router.post("/generate-profile")
-async def generate_company_profile(payload: GenerateProfilePayload, db: Session = Depends(get_db)):
+def generate_company_profile(payload: GenerateProfilePayload, db: Session = Depends(get_db)):
     """Generate a company profile from multiple text sources"""
     profile = profile_generator.generate_profile(payload.company_name, payload.texts)
     return profile
 
 @router.post("/score-company")
-async def score_company(company_profile: dict, strategy_criteria: dict, db: Session = Depends(get_db)):
+def score_company(company_profile: dict, strategy_criteria: dict, db: Session = Depends(get_db)):
     """Score a company based on investment criteria"""
     score_result = company_scorer.score_company(company_profile, strategy_criteria)
     return score_result
 
 @router.post("/calculate-similarity")
-async def calculate_similarity(vector1: list[float], vector2: list[float], db: Session = Depends(get_db)):
+def calculate_similarity(vector1: list[float], vector2: list[float], db: Session = Depends(get_db)):
     """Calculate similarity between two vectors"""
     similarity = similarity_calculator.cosine_similarity(vector1, vector2)
     return {"similarity": similarity}
@@ -1,17 +1,21 @@
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, insert, or_, text
+from sqlalchemy.orm import Session, selectinload
 import asyncio
+import functools
 import logging
 from typing import Dict, Any, List, Optional
 import json
 import requests
 from bs4 import BeautifulSoup
 import nltk
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from tavily import TavilyClient
 from dotenv import load_dotenv
 import re
+import csv
+import io
 from .ai_components import InformationExtractor
 from playwright.async_api import async_playwright
 from fastapi import BackgroundTasks
@@ -34,6 +38,113 @@ from . import models, schemas
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Stateless clients shared by every task this process runs (agents themselves are built per
+# task around that task's DB session)
+@functools.lru_cache(maxsize=None)
+def get_tavily_client() -> TavilyClient:
+    """Tavily client whose HTTP session (and its keep-alive connections) is reused across searches."""
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+@functools.lru_cache(maxsize=None)
+def get_information_extractor() -> InformationExtractor:
+    """InformationExtractor with its stopword list loaded once."""
+    return InformationExtractor()
+
+# A 'running' task may be claimed again only after this long, i.e. once its worker is presumed dead
+# and the broker re-delivered it (the Celery worker uses the same value as its visibility timeout)
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "3600"))
+
+# Batches at or above this size are streamed with COPY when the backend is PostgreSQL
+COPY_THRESHOLD = 100
+
+# (source key, column, max length, default) for the truncated string columns of extracted rows
+_METRIC_SPEC = (
+    ("metric_type", "metric_type", 50, "unknown"),
+    ("unit", "unit", 20, "unknown"),
+    ("period", "time_period", 50, "unknown"),
+)
+_EVENT_SPEC = (
+    ("event_type", "event_type", 50, "unknown"),
+    ("details", "description", 1023, ""),
+)
+
+
+def bulk_store(db: Session, model, mappings: List[Dict[str, Any]]):
+    """Insert mappings with COPY for large PostgreSQL batches, otherwise with one executemany INSERT."""
+    if not mappings:
+        return
+    if len(mappings) < COPY_THRESHOLD or db.get_bind().dialect.name != "postgresql":
+        # ORM bulk INSERT: batched by the dialect (insertmanyvalues / psycopg2 values_plus_batch)
+        db.execute(insert(model), mappings)
+        return
+
+    # COPY bypasses SQLAlchemy, so fill in the Python-side column defaults here
+    table = model.__table__
+    defaults = {}
+    for column in table.columns:
+        if column.primary_key or column.default is None:
+            continue
+        default = column.default
+        defaults[column.name] = default.arg(None) if default.is_callable else default.arg
+    # Primary keys are left to the sequence unless the caller reserved them (bulk_store_returning_ids)
+    columns = [column.name for column in table.columns if not column.primary_key or column.name in mappings[0]]
+    rows = [
+        [mapping[name] if name in mapping else defaults.get(name) for name in columns]
+        for mapping in mappings
+    ]
+    _bulk_copy(db, table.name, columns, rows)
+
+
+
+def bulk_store_returning_ids(db: Session, model, mappings: List[Dict[str, Any]]) -> List[int]:
+    """Insert mappings and return their ids in input order.
+    
+    Large PostgreSQL batches reserve ids from the table's sequence in one query and are then
+    written with COPY; otherwise one INSERT ... RETURNING executemany.
+    """
+    if len(mappings) >= COPY_THRESHOLD and db.get_bind().dialect.name == "postgresql":
+        ids = db.scalars(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+            {"table": model.__table__.name, "n": len(mappings)}
+        ).all()
+        bulk_store(db, model, [{**mapping, "id": id_} for mapping, id_ in zip(mappings, ids)])
+        return ids
+    return db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), mappings).all()
+
+
+def _bulk_copy(db: Session, table: str, columns: List[str], rows: List[List[Any]]):
+    """Stream rows into a table with PostgreSQL COPY on the session's own connection."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, quoting=csv.QUOTE_MINIMAL)
+    for row in rows:
+        writer.writerow([r"\N" if value is None else value for value in row])
+    buf.seek(0)
+
+    # Same connection (and transaction) as the rest of the session, e.g. the overwrite DELETE
+    dbapi_conn = db.connection().connection
+    with dbapi_conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buf
+        )
+    logger.info(f"Copied {len(rows)} rows into {table}.")
+
+
+def _parse_month_name_date(date_str: str) -> datetime:
+    try:
+        return datetime.strptime(date_str, "%B %d, %Y")
+    except ValueError:
+        return datetime.strptime(date_str, "%b %d, %Y")
+
+# Date shapes accepted from LLM output, each routed straight to the one parser that can handle it
+_DATE_DISPATCH = [
+    (re.compile(r'^\d{4}-\d{2}-\d{2}$'), datetime.fromisoformat),
+    (re.compile(r'^\d{4}$'), lambda s: datetime(int(s), 1, 1)),
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$'), lambda s: datetime.strptime(s, "%Y-%m-%d")),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), lambda s: datetime.strptime(s, "%m/%d/%Y")),
+    (re.compile(r'^[A-Za-z]{3,9} \d{1,2}, \d{4}$'), _parse_month_name_date),
+]
+
 class OrchestratorAgent:
     """
     Central coordinator that manages workflow between all other agents.
@@ -64,14 +175,33 @@ class OrchestratorAgent:
              
         try:
             logger.info(f"Setting task {task_id} status to 'running'.")
-            task.status = "running"
-            task.started_at = datetime.utcnow()
+            # Claim with one conditional UPDATE so a duplicate delivery can't run the task twice;
+            # a 'running' task is only taken over once its lease has expired
+            now = datetime.utcnow()
+            claimed = (
+                self.db.query(models.AgentTask)
+                .filter(
+                    models.AgentTask.id == task_id,
+                    or_(
+                        models.AgentTask.status == "pending",
+                        and_(
+                            models.AgentTask.status == "running",
+                            models.AgentTask.started_at < now - timedelta(seconds=TASK_LEASE_SECONDS),
+                        ),
+                    ),
+                )
+                .update({"status": "running", "started_at": now}, synchronize_session=False)
+            )
             self.db.commit()
-            logger.info(f"Task {task_id} status committed as 'running'.")
         except Exception as e_stat:
              logger.error(f"ERROR setting task {task_id} status to running: {e_stat}. Rolling back.")
              self.db.rollback()
              return
+        if not claimed:
+            logger.warning(f"Task {task_id} is already running (status: {task.status}). Skipping.")
+            return
+        self.db.refresh(task)
+        logger.info(f"Task {task_id} status committed as 'running'.")
 
         is_orchestration_task = False
         try:
@@ -240,8 +370,8 @@ class SearchAgent:
     
     def __init__(self, db: Session):
         self.db = db
-        # Initialize Tavily Client with API key from environment
-        self.tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        # Shared Tavily client (API key from environment)
+        self.tavily_client = get_tavily_client()
     
     async def process_task(self, task: models.AgentTask):
         logger.info(f"SearchAgent starting process_task for task {task.id}")
@@ -474,8 +604,8 @@ class InformationExtractionAgent:
 
     def __init__(self, db: Session):
         self.db = db
-        # Initialize the actual InformationExtractor component
-        self.extractor = InformationExtractor()
+        # Shared InformationExtractor component
+        self.extractor = get_information_extractor()
 
     async def process_task(self, task: models.AgentTask):
         """Process an information extraction task using the LLM extractor."""
@@ -511,8 +641,8 @@ class InformationExtractionAgent:
 
         logger.info(f"Extracting information (LLM) from content sourced from: {source_url}")
 
-        # Use the InformationExtractor component's new method
-        extracted_data: ExtractedData = self.extractor.extract_structured_data_with_llm(
+        # Use the async extractor so concurrent extraction tasks overlap their LLM round-trips
+        extracted_data: ExtractedData = await self.extractor.aextract_structured_data_with_llm(
             text=content, 
             # company_context=company_context # Optional context
         )
@@ -523,7 +653,7 @@ class InformationExtractionAgent:
         return {
             "status": "success",
             "source_url": source_url,
-            "extracted_data": extracted_data.dict() # Convert Pydantic model to dict
+            "extracted_data": extracted_data.model_dump() # Convert Pydantic model to dict
         }
         
     # Optional: Method to store extracted data
@@ -563,8 +693,9 @@ class AnalysisAgent:
         if not strategy:
             raise ValueError(f"Strategy not found: {strategy_id}")
         
-        # Get companies from database
-        query = self.db.query(models.Company)
+        # Get companies from database, with their financial metrics loaded in one extra
+        # SELECT ... IN rather than one query per company
+        query = self.db.query(models.Company).options(selectinload(models.Company.financial_metrics))
         
         # Apply filters
         if filters.get("industry"):
@@ -579,9 +710,7 @@ class AnalysisAgent:
         results = []
         for company in companies:
             # Get financial metrics
-            metrics = self.db.query(models.FinancialMetric).filter(
-                models.FinancialMetric.company_id == company.id
-            ).all()
+            metrics = company.financial_metrics
             
             # Calculate score (simplified for MVP)
             score = 0.0
@@ -677,12 +806,16 @@ class StorageAgent:
             # In a real scenario, might need session refresh logic here
             # For now, we assume the session provided by run_task_processor is valid.
 
+        # The store_* methods run their blocking DB work in a worker thread (asyncio.to_thread)
+        # so the event loop stays free; the session is only touched by this task while awaited.
         if task.task_type == "store_extracted_data":
             result = await self.store_extracted_data(task.params)
         elif task.task_type == "store_company_overview":
             result = await self.store_company_overview(task.params)
         elif task.task_type == "store_company_links":
             result = await self.store_company_links(task.params)
+        elif task.task_type == "store_extracted_bundle":
+            result = await self.store_extracted_bundle(task.params)
         # Keep existing vector storage tasks if needed
         elif task.task_type == "store_document_vectors":
             result = await self.store_document_vectors(task.params)
@@ -696,6 +829,9 @@ class StorageAgent:
 
     async def store_extracted_data(self, params: Dict[str, Any]):
         """Store extracted metrics and events linked to a company."""
+        return await asyncio.to_thread(self._store_extracted_data, params)
+
+    def _store_extracted_data(self, params: Dict[str, Any]):
         company_id = params.get("company_id")
         extracted_data = params.get("extracted_data") # This is the dict from ExtractedData model
         source_url = params.get("source_url", "Unknown Source")
@@ -703,47 +839,22 @@ class StorageAgent:
         if not company_id or not extracted_data:
             raise ValueError("company_id and extracted_data are required for storage.")
 
-        company = self.db.query(models.Company).filter(models.Company.id == company_id).first()
-        if not company:
+        if not self._company_exists(company_id):
             logger.warning(f"Company ID {company_id} not found. Cannot store extracted data.")
             return {"status": "failed", "message": f"Company ID {company_id} not found."}
 
-        metrics_stored = 0
-        events_stored = 0
-
-        # Store Metrics
-        if extracted_data.get("metrics"):
-            for metric_data in extracted_data["metrics"]:
-                if metric_data.get("metric_type") and metric_data.get("value") is not None:
-                    # Basic type mapping (can be more sophisticated)
-                    db_metric = models.FinancialMetric(
-                        company_id=company_id,
-                        metric_type=metric_data.get("metric_type", "unknown")[:50], # Ensure length
-                        value=float(metric_data["value"]),
-                        unit=metric_data.get("unit", "unknown")[:20],
-                        time_period=metric_data.get("period", "unknown")[:50],
-                        source=f"LLM Extraction from {source_url}"
-                        # Add confidence score if available
-                    )
-                    self.db.add(db_metric)
-                    metrics_stored += 1
-
-        # Store Events
-        if extracted_data.get("events"):
-            for event_data in extracted_data["events"]:
-                if event_data.get("event_type") and event_data.get("details"):
-                    db_event = models.CompanyEvent(
-                        company_id=company_id,
-                        event_type=event_data.get("event_type", "unknown")[:50],
-                        description=event_data.get("details", "")[:1023], # Ensure length
-                        event_date=self._parse_event_date(event_data.get("date")),
-                        source=f"LLM Extraction from {source_url}"
-                        # Add amount if extracted
-                    )
-                    self.db.add(db_event)
-                    events_stored += 1
+        metric_mappings = self._build_metric_mappings(company_id, extracted_data, source_url)
+        event_mappings = self._build_event_mappings(company_id, extracted_data, source_url)
+
+        metrics_stored = len(metric_mappings)
+        events_stored = len(event_mappings)
 
         try:
+            # Store Metrics & Events (one multi-row INSERT each)
+            if metric_mappings:
+                self._bulk_store(models.FinancialMetric, metric_mappings)
+            if event_mappings:
+                self._bulk_store(models.CompanyEvent, event_mappings)
             self.db.commit()
             logger.info(f"Stored {metrics_stored} metrics and {events_stored} events for Company ID {company_id}.")
             return {
@@ -757,29 +868,42 @@ class StorageAgent:
             logger.error(f"Database error storing extracted data for Company ID {company_id}: {e}")
             raise ValueError(f"DB error storing data: {e}") from e
             
+    def _company_exists(self, company_id: int) -> bool:
+        """Check the company FK with an ID-only query."""
+        return self.db.query(models.Company.id).filter(models.Company.id == company_id).scalar() is not None
+
+    def _bulk_store(self, model, mappings: List[Dict[str, Any]]):
+        """Insert mappings with COPY for large PostgreSQL batches, otherwise with one executemany INSERT."""
+        bulk_store(self.db, model, mappings)
+
     def _parse_event_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Attempt to parse various date formats."""
         if not date_str:
             return None
-        # Add more formats as needed
-        formats = ["%Y-%m-%d", "%B %d, %Y", "%b %d, %Y", "%m/%d/%Y", "%Y"]
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str.strip(), fmt)
-            except ValueError:
-                continue
+        # Add more formats to _DATE_DISPATCH as needed
+        date_str = date_str.strip()
+        for pattern, parse in _DATE_DISPATCH:
+            if pattern.match(date_str):
+                try:
+                    return parse(date_str)
+                except ValueError:
+                    break # Right shape but invalid values (e.g. month 13)
         logger.warning(f"Could not parse date string: {date_str}")
         return None # Or default to now: datetime.utcnow()
         
     async def store_company_overview(self, params: Dict[str, Any]):
         """Store or update the company overview/description."""
+        return await asyncio.to_thread(self._store_company_overview, params)
+
+    def _store_company_overview(self, params: Dict[str, Any]):
         company_id = params.get("company_id")
         overview = params.get("overview")
 
         if not company_id or overview is None: # Allow empty string
             raise ValueError("company_id and overview are required.")
 
-        company = self.db.query(models.Company).filter(models.Company.id == company_id).first()
+        # The row is mutated here, so load it (served from the identity map when already present)
+        company = self.db.get(models.Company, company_id)
         if not company:
             logger.warning(f"Company ID {company_id} not found. Cannot store overview.")
             return {"status": "failed", "message": f"Company ID {company_id} not found."}
@@ -796,6 +920,9 @@ class StorageAgent:
             
     async def store_company_links(self, params: Dict[str, Any]):
         """Store source links for a company."""
+        return await asyncio.to_thread(self._store_company_links, params)
+
+    def _store_company_links(self, params: Dict[str, Any]):
         company_id = params.get("company_id")
         links = params.get("links") # Expecting list of dicts: {"url": ..., "description": ..., "link_type": ...}
         overwrite = params.get("overwrite", False) # Option to replace existing links
@@ -803,30 +930,20 @@ class StorageAgent:
         if not company_id or not isinstance(links, list):
             raise ValueError("company_id and a list of links are required.")
 
-        company = self.db.query(models.Company).filter(models.Company.id == company_id).first()
-        if not company:
+        if not self._company_exists(company_id):
             logger.warning(f"Company ID {company_id} not found. Cannot store links.")
             return {"status": "failed", "message": f"Company ID {company_id} not found."}
 
-        if overwrite:
-            # Delete existing links for this company if overwriting
-            self.db.query(models.CompanySourceLink).filter(models.CompanySourceLink.company_id == company_id).delete()
-            logger.info(f"Deleted existing links for Company ID {company_id} due to overwrite flag.")
-            
-        links_stored = 0
-        for link_data in links:
-            if link_data.get("url"):
-                # Basic type mapping
-                db_link = models.CompanySourceLink(
-                    company_id=company_id,
-                    url=link_data["url"][:1023], # Ensure length
-                    description=link_data.get("description", None),
-                    link_type=link_data.get("link_type", "other")[:50]
-                )
-                self.db.add(db_link)
-                links_stored += 1
+        link_mappings = self._build_link_mappings(company_id, links)
+        links_stored = len(link_mappings)
         
         try:
+            if overwrite:
+                # Delete existing links for this company if overwriting
+                self._delete_company_links(company_id)
+                logger.info(f"Deleted existing links for Company ID {company_id} due to overwrite flag.")
+            if link_mappings:
+                self._bulk_store(models.CompanySourceLink, link_mappings)
             self.db.commit()
             logger.info(f"Stored {links_stored} links for Company ID {company_id}.")
             return {
@@ -839,6 +956,113 @@ class StorageAgent:
             logger.error(f"Database error storing links for Company ID {company_id}: {e}")
             raise ValueError(f"DB error storing links: {e}") from e
 
+    def _delete_company_links(self, company_id: int):
+        """Delete a company's source links with a single server-side DELETE."""
+        self.db.execute(
+            delete(models.CompanySourceLink)
+            .where(models.CompanySourceLink.company_id == company_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def store_extracted_bundle(self, params: Dict[str, Any]):
+        """Store metrics, events, links and overview for one extracted document in a single transaction."""
+        return await asyncio.to_thread(self._store_extracted_bundle, params)
+
+    def _store_extracted_bundle(self, params: Dict[str, Any]):
+        company_id = params.get("company_id")
+        extracted_data = params.get("extracted_data") or {}
+        overview = params.get("overview")
+        links = params.get("links") or []
+        overwrite = params.get("overwrite", False)
+        source_url = params.get("source_url", "Unknown Source")
+
+        if not company_id or not (extracted_data or overview is not None or links):
+            raise ValueError("company_id and at least one of extracted_data, overview or links are required.")
+
+        if not self._company_exists(company_id):
+            logger.warning(f"Company ID {company_id} not found. Cannot store extracted bundle.")
+            return {"status": "failed", "message": f"Company ID {company_id} not found."}
+
+        metric_mappings = self._build_metric_mappings(company_id, extracted_data, source_url)
+        event_mappings = self._build_event_mappings(company_id, extracted_data, source_url)
+        link_mappings = self._build_link_mappings(company_id, links)
+
+        try:
+            if overwrite:
+                self._delete_company_links(company_id)
+            if metric_mappings:
+                self._bulk_store(models.FinancialMetric, metric_mappings)
+            if event_mappings:
+                self._bulk_store(models.CompanyEvent, event_mappings)
+            if link_mappings:
+                self._bulk_store(models.CompanySourceLink, link_mappings)
+            if overview is not None:
+                self.db.query(models.Company).filter(models.Company.id == company_id).update(
+                    {models.Company.description: overview}, synchronize_session=False
+                )
+            self.db.commit() # One commit for the whole document
+            logger.info(
+                f"Stored bundle for Company ID {company_id}: {len(metric_mappings)} metrics, "
+                f"{len(event_mappings)} events, {len(link_mappings)} links, overview updated: {overview is not None}."
+            )
+            return {
+                "status": "success",
+                "message": (
+                    f"Stored {len(metric_mappings)} metrics, {len(event_mappings)} events "
+                    f"and {len(link_mappings)} links."
+                ),
+                "metrics_stored": len(metric_mappings),
+                "events_stored": len(event_mappings),
+                "links_stored": len(link_mappings),
+                "overview_updated": overview is not None
+            }
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Database error storing extracted bundle for Company ID {company_id}: {e}")
+            raise ValueError(f"DB error storing bundle: {e}") from e
+
+    # --- Row mapping builders (plain dicts for bulk inserts) ---
+    def _build_metric_mappings(self, company_id: int, extracted_data: Dict[str, Any], source_url: str) -> List[Dict[str, Any]]:
+        """Build FinancialMetric rows from an ExtractedData dict, skipping incomplete metrics."""
+        source = f"LLM Extraction from {source_url}"
+        return [
+            {
+                "company_id": company_id,
+                "value": float(metric_data["value"]),
+                "source": source,
+                **{column: (metric_data.get(key) or default)[:max_len] for key, column, max_len, default in _METRIC_SPEC}
+            }
+            for metric_data in extracted_data.get("metrics") or []
+            if metric_data.get("metric_type") and metric_data.get("value") is not None
+        ]
+
+    def _build_event_mappings(self, company_id: int, extracted_data: Dict[str, Any], source_url: str) -> List[Dict[str, Any]]:
+        """Build CompanyEvent rows from an ExtractedData dict, skipping incomplete events."""
+        source = f"LLM Extraction from {source_url}"
+        return [
+            {
+                "company_id": company_id,
+                "event_date": self._parse_event_date(event_data.get("date")),
+                "source": source,
+                **{column: (event_data.get(key) or default)[:max_len] for key, column, max_len, default in _EVENT_SPEC}
+            }
+            for event_data in extracted_data.get("events") or []
+            if event_data.get("event_type") and event_data.get("details")
+        ]
+
+    def _build_link_mappings(self, company_id: int, links: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build CompanySourceLink rows, skipping links without a URL."""
+        return [
+            {
+                "company_id": company_id,
+                "url": link_data["url"][:1023], # Ensure length
+                "description": link_data.get("description", None),
+                "link_type": (link_data.get("link_type") or "other")[:50]
+            }
+            for link_data in links
+            if link_data.get("url")
+        ]
+
     # Keep existing vector storage methods
     async def store_document_vectors(self, params: Dict[str, Any]):
         logger.info(f"Processing document vectors with params: {params}")
@@ -1,16 +1,23 @@
+import asyncio
 import nltk
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
+import orjson
 import re
 from datetime import datetime
 import logging
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from llama_index.llms.gemini import Gemini
 from llama_index.core import Settings
 from dotenv import load_dotenv
 from llama_index.core import PromptTemplate
 
+try:
+    from numba import njit
+except ImportError: # Numba is optional; the scoring kernel falls back to plain Python
+    njit = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +30,15 @@ try:
 except:
     logger.warning("Failed to download NLTK data. Some NLP features may not work properly.")
 
+# HTML tags (within a single line), special characters and digit runs, stripped in one pass
+_CLEAN_RE = re.compile(r'<[^>\n]*>|[^\w\s]|\d+')
+_WS_RE = re.compile(r'\s+')
+# Sentence boundary: terminal punctuation, whitespace, then an uppercase letter or opening quote
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z"\'])')
+_NLTK_FALLBACK_MIN_CHARS = 1000
+# Fenced JSON object in an LLM response
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL | re.IGNORECASE)
+
 class TextProcessor:
     """
     Handles text preprocessing for embedding generation and information extraction.
@@ -30,9 +46,9 @@ class TextProcessor:
     
     def __init__(self):
         try:
-            self.stopwords = set(nltk.corpus.stopwords.words('english'))
+            self.stopwords = frozenset(nltk.corpus.stopwords.words('english'))
         except:
-            self.stopwords = set()
+            self.stopwords = frozenset()
             logger.warning("Failed to load stopwords. Continuing without stopword removal.")
     
     def clean_text(self, text: str) -> str:
@@ -40,62 +56,60 @@ class TextProcessor:
         if not text:
             return ""
         
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove HTML tags
-        text = re.sub(r'<.*?>', ' ', text)
-        
-        # Remove special characters and digits
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\d+', ' ', text)
+        # Lowercase, then drop HTML tags, special characters and digits
+        text = _CLEAN_RE.sub(' ', text.lower())
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
+        return _WS_RE.sub(' ', text).strip()
     
     def remove_stopwords(self, text: str) -> str:
         """Remove stopwords from text"""
         if not text:
             return ""
         
-        words = text.split()
-        filtered_words = [word for word in words if word not in self.stopwords]
-        return ' '.join(filtered_words)
+        stopwords = self.stopwords # Hoist the attribute lookup out of the loop
+        return ' '.join(word for word in text.split() if word not in stopwords)
     
     def tokenize(self, text: str) -> List[str]:
         """Tokenize text into sentences"""
         if not text:
             return []
         
-        return nltk.sent_tokenize(text)
+        text = text.strip()
+        sentences = _SENT_SPLIT_RE.split(text)
+        # Fall back to NLTK's Punkt model only for long text the regex couldn't split
+        if len(sentences) < 2 and len(text) >= _NLTK_FALLBACK_MIN_CHARS:
+            return nltk.sent_tokenize(text)
+        return sentences
     
     def chunk_text(self, text: str, chunk_size: int = 512, overlap: int = 100) -> List[str]:
-        """Split text into overlapping chunks of approximately chunk_size tokens"""
+        """Split text into chunks of about chunk_size characters, carrying up to overlap characters of trailing sentences"""
         if not text:
             return []
         
         sentences = self.tokenize(text)
         chunks = []
-        current_chunk = ""
+        buf: List[str] = []
+        buf_len = 0 # Length of ' '.join(buf)
         
         for sentence in sentences:
             # If adding this sentence would exceed chunk size and we already have content
-            if len(current_chunk) + len(sentence) > chunk_size and current_chunk:
-                chunks.append(current_chunk.strip())
-                # Start new chunk with overlap from previous chunk
-                words = current_chunk.split()
-                if len(words) > overlap:
-                    current_chunk = ' '.join(words[-overlap:]) + ' ' + sentence
-                else:
-                    current_chunk = sentence
-            else:
-                current_chunk += ' ' + sentence
+            if buf and buf_len + 1 + len(sentence) > chunk_size:
+                chunks.append(' '.join(buf).strip())
+                # Seed the next chunk with the trailing sentences that fit in the overlap (never the whole chunk)
+                start = len(buf)
+                tail_len = -1
+                while start > 1 and tail_len + 1 + len(buf[start - 1]) <= overlap:
+                    start -= 1
+                    tail_len += 1 + len(buf[start])
+                buf = buf[start:]
+                buf_len = max(tail_len, 0)
+            buf_len += len(sentence) + (1 if buf else 0)
+            buf.append(sentence)
         
         # Add the last chunk if it has content
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if buf:
+            chunks.append(' '.join(buf).strip())
         
         return chunks
 
@@ -126,6 +140,25 @@ class ExtractedData(BaseModel):
 
 # --- End Pydantic Models ---
 
+# The schema and instructions don't change between calls, so build them once
+_EXTRACTED_SCHEMA_JSON = json.dumps(ExtractedData.model_json_schema(), indent=2)
+_EXTRACTION_PROMPT_BODY = f"""Your goal is to populate a JSON object matching the following schema. 
+Only output the JSON object, with no introductory text or explanations.
+
+Schema:
+```json
+{_EXTRACTED_SCHEMA_JSON}
+```
+
+Focus on financial metrics (like revenue, funding, employee count, growth rates) 
+and key company events (like funding rounds, acquisitions, partnerships, product launches, key hires).
+Provide a brief summary of the text's key points related to the company (if identifiable).
+Identify the company name if explicitly mentioned.
+
+Text to analyze:
+
+"""
+
 
 class InformationExtractor:
     """
@@ -150,6 +183,33 @@ class InformationExtractor:
     # def extract_company_events(self, text: str) -> List[Dict[str, Any]]: ...
     # def _extract_date(self, text: str, position: int) -> Optional[str]: ...
 
+    def _build_extraction_prompt(self, text: str, company_context: Optional[str] = None) -> str:
+        """Build the JSON extraction prompt for a piece of text"""
+        context_str = f" focusing on information relevant to the company {company_context}" if company_context else ""
+        return f"""\nPlease analyze the following text{context_str} and extract relevant information.
+{_EXTRACTION_PROMPT_BODY}{text}
+
+
+JSON Output:
+"""
+
+    def _parse_llm_output(self, raw_output: str) -> ExtractedData:
+        """Pull the JSON object out of the LLM response and validate it"""
+        json_match = _JSON_BLOCK_RE.search(raw_output)
+        if json_match:
+            logger.info("Extracted JSON block from markdown.")
+            # Parse the sliced block with orjson, then validate the resulting dict
+            validated_data = ExtractedData.model_validate(orjson.loads(json_match.group(1)))
+        else:
+            json_str = raw_output.strip()
+            if json_str.startswith('json'):
+                json_str = json_str[4:].strip()
+            logger.info("Attempting to parse raw output as JSON (no markdown found).")
+            # Parse and validate in one pass; malformed JSON surfaces as a ValidationError too
+            validated_data = ExtractedData.model_validate_json(json_str)
+        logger.info("Successfully parsed and validated LLM output.")
+        return validated_data
+
     def extract_structured_data_with_llm(self, text: str, company_context: Optional[str] = None) -> ExtractedData:
         """Extracts structured data using Gemini LLM, prompting for JSON output."""
         if not Settings.llm:
@@ -159,32 +219,7 @@ class InformationExtractor:
         if not text:
             return ExtractedData()
 
-        # Get the JSON schema for the desired output
-        output_schema = ExtractedData.model_json_schema()
-
-        # Define the prompt string
-        context_str = f" focusing on information relevant to the company {company_context}" if company_context else ""
-        prompt_str = f"""\nPlease analyze the following text{context_str} and extract relevant information.
-Your goal is to populate a JSON object matching the following schema. 
-Only output the JSON object, with no introductory text or explanations.
-
-Schema:
-```json
-{json.dumps(output_schema, indent=2)}
-```
-
-Focus on financial metrics (like revenue, funding, employee count, growth rates) 
-and key company events (like funding rounds, acquisitions, partnerships, product launches, key hires).
-Provide a brief summary of the text's key points related to the company (if identifiable).
-Identify the company name if explicitly mentioned.
-
-Text to analyze:
-
-{text}
-
-
-JSON Output:
-"""
+        prompt_str = self._build_extraction_prompt(text, company_context)
 
         logger.info(f"Sending request to Gemini for structured extraction. Text length: {len(text)}")
         raw_output = "" # Initialize raw_output
@@ -193,30 +228,46 @@ JSON Output:
             raw_output = response.text
             logger.info(f"Received raw output from LLM. Length: {len(raw_output)}")
             # print(f"Raw LLM Output:\n{raw_output}") # Uncomment for debugging
+            return self._parse_llm_output(raw_output)
 
-            json_str = raw_output
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', raw_output, re.DOTALL | re.IGNORECASE)
-            if json_match:
-                json_str = json_match.group(1).strip()
-                logger.info("Extracted JSON block from markdown.")
-            else:
-                json_str = raw_output.strip()
-                if json_str.startswith('json'):
-                    json_str = json_str[4:].strip()
-                logger.info("Attempting to parse raw output as JSON (no markdown found).")
-
-            parsed_json = json.loads(json_str)
-            validated_data = ExtractedData(**parsed_json)
-            logger.info("Successfully parsed and validated LLM output.")
-            return validated_data # Return successful data
-
-        except json.JSONDecodeError as e:
+        except (ValidationError, orjson.JSONDecodeError) as e:
             logger.error(f"Failed to parse JSON output from LLM: {e}\nRaw Output was: {raw_output}")
             return ExtractedData() # Return empty on parsing error
         except Exception as e:
             logger.error(f"Error processing LLM response for extraction: {e}\nRaw Output was: {raw_output}")
             return ExtractedData() # Return empty on other errors
 
+    async def aextract_structured_data_with_llm(self, text: str, company_context: Optional[str] = None) -> ExtractedData:
+        """Async variant of extract_structured_data_with_llm using the LLM's acomplete."""
+        if not Settings.llm:
+            logger.error("LLM is not configured globally. Cannot perform extraction.")
+            return ExtractedData()
+
+        if not text:
+            return ExtractedData()
+
+        prompt_str = self._build_extraction_prompt(text, company_context)
+
+        logger.info(f"Sending async request to Gemini for structured extraction. Text length: {len(text)}")
+        raw_output = ""
+        try:
+            response = await Settings.llm.acomplete(prompt_str)
+            raw_output = response.text
+            logger.info(f"Received raw output from LLM. Length: {len(raw_output)}")
+            return self._parse_llm_output(raw_output)
+
+        except (ValidationError, orjson.JSONDecodeError) as e:
+            logger.error(f"Failed to parse JSON output from LLM: {e}\nRaw Output was: {raw_output}")
+            return ExtractedData()
+        except Exception as e:
+            logger.error(f"Error processing LLM response for extraction: {e}\nRaw Output was: {raw_output}")
+            return ExtractedData()
+
+    async def extract_batch(self, items: List[Tuple[str, Optional[str]]]) -> List[ExtractedData]:
+        """Extract structured data from many (text, company_context) pairs concurrently"""
+        # Each call already falls back to an empty ExtractedData on failure
+        return await asyncio.gather(*(self.aextract_structured_data_with_llm(text, context) for text, context in items))
+
 
 class CompanyProfileGenerator:
     """
@@ -287,6 +338,39 @@ class CompanyProfileGenerator:
         return description
 
 
+class CompanyProfileTable:
+    """
+    Column-oriented view over a batch of company profile dicts.
+    """
+    
+    def __init__(self, names: List[str], industries: List[Optional[str]], locations: List[Optional[str]],
+                 revenues: np.ndarray, growth_rates: np.ndarray, employee_counts: np.ndarray):
+        self.names = names
+        self.industries = industries
+        self.locations = locations
+        # Missing numeric fields are NaN
+        self.revenues = revenues
+        self.growth_rates = growth_rates
+        self.employee_counts = employee_counts
+    
+    @classmethod
+    def from_profiles(cls, profiles: List[Dict[str, Any]]) -> "CompanyProfileTable":
+        """Build the table from profile dicts as produced by CompanyProfileGenerator"""
+        nan = float('nan')
+        metrics = [p.get('financial_metrics', {}) for p in profiles]
+        return cls(
+            names=[p.get('name') for p in profiles],
+            industries=[p.get('industry') for p in profiles],
+            locations=[p.get('location') for p in profiles],
+            revenues=np.array([m.get('revenue', nan) for m in metrics], dtype=np.float64),
+            growth_rates=np.array([m.get('growth_rate', nan) for m in metrics], dtype=np.float64),
+            employee_counts=np.array([m.get('employee_count', nan) for m in metrics], dtype=np.float64),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
 class SimilarityCalculator:
     """
     Calculates similarity between vectors.
@@ -294,7 +378,7 @@ class SimilarityCalculator:
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
+        if len(vec1) == 0 or len(vec2) == 0 or len(vec1) != len(vec2):
             return 0.0
         
         # Convert to numpy arrays for efficient calculation
@@ -312,8 +396,95 @@ class SimilarityCalculator:
         return dot_product / (norm_a * norm_b)
     
     def batch_cosine_similarity(self, query_vec: List[float], vectors: List[List[float]]) -> List[float]:
-        """Calculate cosine similarity between query vector and multiple vectors"""
-        return [self.cosine_similarity(query_vec, vec) for vec in vectors]
+        """Calculate cosine similarity between query vector and multiple vectors
+        
+        Lists are scored in float64 like cosine_similarity, so a pair scores the same through either
+        method; an EmbeddingMatrix trades that for half-precision storage (about 1e-3 off).
+        """
+        if isinstance(vectors, EmbeddingMatrix):
+            return vectors.cosine_similarity(query_vec)
+        if len(vectors) < 2 or len(query_vec) == 0 or any(len(vec) != len(query_vec) for vec in vectors):
+            return [self.cosine_similarity(query_vec, vec) for vec in vectors]
+        
+        # Stack the candidates once so all dot products run as a single matrix-vector product
+        m = np.asarray(vectors, dtype=np.float64)
+        q = np.asarray(query_vec, dtype=np.float64)
+        denom = np.linalg.norm(m, axis=1) * np.linalg.norm(q)
+        sims = np.divide(m @ q, denom, out=np.zeros(len(m)), where=denom != 0)
+        return sims.tolist()
+
+
+class EmbeddingMatrix:
+    """
+    Stores L2-normalized embeddings as one contiguous float16 matrix.
+    """
+    
+    # Rows upcast to float32 per step of a query, so the full matrix is never copied at once
+    BLOCK_ROWS = 4096
+    
+    def __init__(self, vectors: List[List[float]]):
+        m = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1) if vectors else np.zeros((0, 0), dtype=np.float32)
+        # Normalize once at write time so queries reduce to a dot product; zero rows stay zero
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        np.divide(m, norms, out=m, where=norms != 0)
+        self._m = m.astype(np.float16)
+    
+    def __len__(self) -> int:
+        return self._m.shape[0]
+    
+    def cosine_similarity(self, query_vec: List[float]) -> List[float]:
+        """Calculate cosine similarity between query vector and every stored vector"""
+        if not len(self) or len(query_vec) != self._m.shape[1]:
+            return [0.0] * len(self)
+        
+        q = np.asarray(query_vec, dtype=np.float32)
+        q_norm = np.linalg.norm(q)
+        if q_norm == 0:
+            return [0.0] * len(self)
+        q = q / q_norm # Not in place: asarray may have returned the caller's own array
+        # Upcast to float32 for the product one block at a time; only the stored copy is half precision
+        sims = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), self.BLOCK_ROWS):
+            block = self._m[start:start + self.BLOCK_ROWS]
+            np.matmul(block.astype(np.float32), q, out=sims[start:start + len(block)])
+        return sims.tolist()
+
+
+def _score_kernel(industry, location, revenue, growth, active, weights, min_rev, max_rev, min_g, pref_g):
+    """Normalized weighted scores for N companies; NaN marks a missing profile field"""
+    n = revenue.shape[0]
+    scores = np.zeros(n)
+    for i in range(n):
+        total_score = 0.0
+        total_weight = 0.0
+        if active[0] and not np.isnan(industry[i]):
+            total_score += industry[i] * weights[0]
+            total_weight += weights[0]
+        if active[1] and not np.isnan(revenue[i]):
+            match = 0.0
+            if min_rev <= revenue[i] <= max_rev:
+                match = 1.0
+            elif revenue[i] < min_rev:
+                match = max(0.0, revenue[i] / min_rev)
+            total_score += match * weights[1]
+            total_weight += weights[1]
+        if active[2] and not np.isnan(growth[i]):
+            match = 0.0
+            if growth[i] >= pref_g:
+                match = 1.0
+            elif growth[i] >= min_g:
+                match = (growth[i] - min_g) / (pref_g - min_g)
+            total_score += match * weights[2]
+            total_weight += weights[2]
+        if active[3] and not np.isnan(location[i]):
+            total_score += location[i] * weights[3]
+            total_weight += weights[3]
+        if total_weight > 0:
+            scores[i] = total_score / total_weight
+    return scores
+
+if njit is not None:
+    _score_kernel = njit(cache=True)(_score_kernel)
 
 
 class CompanyScorer:
@@ -326,32 +497,23 @@ class CompanyScorer:
     
     def score_company(self, company_profile: Dict[str, Any], strategy_criteria: Dict[str, Any]) -> Dict[str, Any]:
         """Score a company based on investment criteria"""
-        score_breakdown = {}
-        total_score = 0.0
-        total_weight = 0.0
+        weights_config = strategy_criteria.get('weights', {})
+        financial_metrics = company_profile.get('financial_metrics', {})
+        
+        # Parallel (breakdown key, match, weight) lists for the criteria that apply
+        keys: List[str] = []
+        matches: List[float] = []
+        weights: List[float] = []
         
         # Industry match
         if 'industry_focus' in strategy_criteria and 'industry' in company_profile:
-            weight = strategy_criteria.get('weights', {}).get('industry', 1.0)
-            total_weight += weight
-            
-            industry_match = 0.0
-            if company_profile['industry'] in strategy_criteria['industry_focus']:
-                industry_match = 1.0
-            
-            score_breakdown['industry_match'] = {
-                'score': industry_match,
-                'weight': weight,
-                'weighted_score': industry_match * weight
-            }
-            total_score += industry_match * weight
+            keys.append('industry_match')
+            matches.append(1.0 if company_profile['industry'] in strategy_criteria['industry_focus'] else 0.0)
+            weights.append(weights_config.get('industry', 1.0))
         
         # Revenue criteria
-        if 'revenue_range' in strategy_criteria and 'financial_metrics' in company_profile and 'revenue' in company_profile['financial_metrics']:
-            weight = strategy_criteria.get('weights', {}).get('revenue', 1.0)
-            total_weight += weight
-            
-            revenue = company_profile['financial_metrics']['revenue']
+        if 'revenue_range' in strategy_criteria and 'revenue' in financial_metrics:
+            revenue = financial_metrics['revenue']
             min_revenue = strategy_criteria['revenue_range'].get('min', 0)
             max_revenue = strategy_criteria['revenue_range'].get('max', float('inf'))
             
@@ -362,19 +524,13 @@ class CompanyScorer:
                 # Partial score for being close to minimum
                 revenue_match = max(0, revenue / min_revenue)
             
-            score_breakdown['revenue_match'] = {
-                'score': revenue_match,
-                'weight': weight,
-                'weighted_score': revenue_match * weight
-            }
-            total_score += revenue_match * weight
+            keys.append('revenue_match')
+            matches.append(revenue_match)
+            weights.append(weights_config.get('revenue', 1.0))
         
         # Growth criteria
-        if 'growth_criteria' in strategy_criteria and 'financial_metrics' in company_profile and 'growth_rate' in company_profile['financial_metrics']:
-            weight = strategy_criteria.get('weights', {}).get('growth', 1.0)
-            total_weight += weight
-            
-            growth_rate = company_profile['financial_metrics']['growth_rate']
+        if 'growth_criteria' in strategy_criteria and 'growth_rate' in financial_metrics:
+            growth_rate = financial_metrics['growth_rate']
             min_growth = strategy_criteria['growth_criteria'].get('min_annual_growth', 0)
             preferred_growth = strategy_criteria['growth_criteria'].get('preferred_annual_growth', min_growth * 2)
             
@@ -385,30 +541,32 @@ class CompanyScorer:
                 # Linear scaling between min and preferred
                 growth_match = (growth_rate - min_growth) / (preferred_growth - min_growth)
             
-            score_breakdown['growth_match'] = {
-                'score': growth_match,
-                'weight': weight,
-                'weighted_score': growth_match * weight
-            }
-            total_score += growth_match * weight
+            keys.append('growth_match')
+            matches.append(growth_match)
+            weights.append(weights_config.get('growth', 1.0))
         
         # Geographic criteria
         if 'geographic_focus' in strategy_criteria and 'location' in company_profile:
-            weight = strategy_criteria.get('weights', {}).get('location', 1.0)
-            total_weight += weight
-            
-            location_match = 0.0
-            for geo in strategy_criteria['geographic_focus']:
-                if geo.lower() in company_profile['location'].lower():
-                    location_match = 1.0
-                    break
-            
-            score_breakdown['location_match'] = {
-                'score': location_match,
-                'weight': weight,
-                'weighted_score': location_match * weight
+            location = company_profile['location'].lower()
+            keys.append('location_match')
+            matches.append(1.0 if any(geo.lower() in location for geo in strategy_criteria['geographic_focus']) else 0.0)
+            weights.append(weights_config.get('location', 1.0))
+        
+        # Accumulate the weighted scores in one vector operation
+        match_arr = np.array(matches, dtype=np.float64)
+        weight_arr = np.array(weights, dtype=np.float64)
+        weighted_arr = match_arr * weight_arr
+        total_score = float(weighted_arr.sum())
+        total_weight = float(weight_arr.sum())
+        
+        score_breakdown = {
+            key: {
+                'score': matches[i],
+                'weight': weights[i],
+                'weighted_score': float(weighted_arr[i])
             }
-            total_score += location_match * weight
+            for i, key in enumerate(keys)
+        }
         
         # Normalize score
         normalized_score = total_score / total_weight if total_weight > 0 else 0.0
@@ -422,6 +580,45 @@ class CompanyScorer:
             'explanation': explanation
         }
     
+    def score_companies_batch(self, company_profiles: List[Dict[str, Any]], strategy_criteria: Dict[str, Any]) -> List[float]:
+        """Overall scores for many companies against one strategy (no breakdown or explanation)"""
+        if not company_profiles:
+            return []
+        return self.score_table(CompanyProfileTable.from_profiles(company_profiles), strategy_criteria).tolist()
+    
+    def score_table(self, table: CompanyProfileTable, strategy_criteria: Dict[str, Any]) -> np.ndarray:
+        """Overall scores for every row of a CompanyProfileTable"""
+        if not len(table):
+            return np.zeros(0)
+        
+        industries = np.array(table.industries, dtype=object)
+        missing_industry = np.array([i is None for i in table.industries])
+        industry = np.where(missing_industry, np.nan, np.isin(industries, strategy_criteria.get('industry_focus', [])))
+        geographic_focus = [geo.lower() for geo in strategy_criteria.get('geographic_focus', [])]
+        location = np.array([
+            (1.0 if any(geo in loc.lower() for geo in geographic_focus) else 0.0) if loc is not None else np.nan
+            for loc in table.locations
+        ])
+        
+        active = np.array([
+            'industry_focus' in strategy_criteria,
+            'revenue_range' in strategy_criteria,
+            'growth_criteria' in strategy_criteria,
+            'geographic_focus' in strategy_criteria
+        ])
+        weights_config = strategy_criteria.get('weights', {})
+        weights = np.array([weights_config.get(k, 1.0) for k in ('industry', 'revenue', 'growth', 'location')], dtype=np.float64)
+        
+        revenue_range = strategy_criteria.get('revenue_range', {})
+        growth_criteria = strategy_criteria.get('growth_criteria', {})
+        min_growth = growth_criteria.get('min_annual_growth', 0)
+        
+        return _score_kernel(
+            industry, location, table.revenues, table.growth_rates, active, weights,
+            float(revenue_range.get('min', 0)), float(revenue_range.get('max', float('inf'))),
+            float(min_growth), float(growth_criteria.get('preferred_annual_growth', min_growth * 2))
+        )
+    
     def _generate_explanation(self, company_profile: Dict[str, Any], score_breakdown: Dict[str, Any], overall_score: float) -> str:
         """Generate a natural language explanation for the score"""
         company_name = company_profile.get('name', 'The company')
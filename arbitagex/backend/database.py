@@ -1,14 +1,49 @@
+import os
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# SQLite database for development
-SQLALCHEMY_DATABASE_URL = "sqlite:///./arbitragex.db"
+# SQLite database for development; set DATABASE_URL to point at PostgreSQL
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./arbitragex.db")
+
+# Sized for the orchestrator's concurrent agent tasks, each of which checks out a connection,
+# and to cover FastAPI's 40-thread pool for the sync request handlers; override per deployment
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "32"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "16"))
+# Seconds a request waits for a free connection before failing
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle connections before server/proxy idle timeouts drop them
+POOL_RECYCLE = 1800
+
+def _json_serializer(value) -> str:
+    """orjson-backed serializer for JSON columns (AgentTask params/result)."""
+    # Accept non-str keys (stringified, as the stdlib encoder does) and numpy values
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
 
 # Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False},
+        json_serializer=_json_serializer, json_deserializer=orjson.loads
+    )
+else:
+    engine_kwargs = {}
+    if SQLALCHEMY_DATABASE_URL.startswith(("postgresql://", "postgresql+psycopg2://")):
+        # Batch executemany() calls (bulk INSERTs) into multi-VALUES INSERTs
+        engine_kwargs["executemany_mode"] = "values_plus_batch"
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_pre_ping=False, # Connectivity is checked once at startup instead of on every checkout
+        pool_recycle=POOL_RECYCLE,
+        insertmanyvalues_page_size=500,
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
+        **engine_kwargs,
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,7 +53,9 @@ Base = declarative_base()
 
 # Dependency to get DB session
 def get_db():
-    db = SessionLocal()
+    # Request sessions are short-lived, so objects stay loaded after commit instead of being
+    # expired and re-SELECTed when the response is serialized
+    db = SessionLocal(expire_on_commit=False)
     try:
         yield db
     finally:
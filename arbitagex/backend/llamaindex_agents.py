@@ -3,8 +3,12 @@ Enhanced ArbitrageX Agent System using LlamaIndex for orchestration
 """
 
 import os
+import asyncio
+import hashlib
 import json
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from dotenv import load_dotenv
@@ -23,6 +27,7 @@ from llama_index.core.agent import ReActAgent
 from llama_index.llms.gemini import Gemini  # Import Gemini LLM
 from llama_index.embeddings.gemini import GeminiEmbedding # Import Gemini Embedding
 from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode
 
 # Fetch API key from environment
 google_api_key = os.getenv("GOOGLE_API_KEY")
@@ -34,6 +39,35 @@ Settings.llm = Gemini(api_key=google_api_key, model_name="models/gemini-2.5-pro-
 Settings.embed_model = GeminiEmbedding(api_key=google_api_key, model_name="models/embedding-001") # Default Gemini embedding model
 Settings.node_parser = SentenceSplitter(chunk_size=512, chunk_overlap=20)
 
+# Chunk embeddings keyed by (embedding model, SHA-256 of the embedded text), shared by all
+# orchestrators so re-ingesting unchanged content skips the embedding API round-trip
+EMBED_CACHE_SIZE = 4096
+_embed_cache: "OrderedDict[tuple, List[float]]" = OrderedDict()
+_embed_cache_lock = threading.Lock()
+
+async def _embed_with_cache(texts: List[str]) -> List[List[float]]:
+    """Embeds texts with Settings.embed_model, reusing cached vectors for text seen before."""
+    model_name = Settings.embed_model.model_name
+    keys = [(model_name, hashlib.sha256(text.encode()).hexdigest()) for text in texts]
+    embeddings: Dict[tuple, List[float]] = {}
+    with _embed_cache_lock:
+        for key in keys:
+            if key in _embed_cache:
+                _embed_cache.move_to_end(key)
+                embeddings[key] = _embed_cache[key]
+    # Each distinct uncached text is embedded once; the async batch call splits them into
+    # embed_batch_size requests and awaits those concurrently instead of blocking the loop
+    missing = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+    if missing:
+        computed = await Settings.embed_model.aget_text_embedding_batch(list(missing.values()))
+        embeddings.update(zip(missing, computed))
+        with _embed_cache_lock:
+            for key in missing:
+                _embed_cache[key] = embeddings[key]
+            while len(_embed_cache) > EMBED_CACHE_SIZE:
+                _embed_cache.popitem(last=False)
+    return [embeddings[key] for key in keys]
+
 class LlamaIndexOrchestrator:
     """
     Enhanced orchestrator using LlamaIndex for agent coordination and document processing
@@ -43,15 +77,19 @@ class LlamaIndexOrchestrator:
         """Initialize the LlamaIndex orchestrator"""
         self.db = db_session
         
-        # Initialize ChromaDB client and collection
-        # Ensure ./chroma_db_data directory exists or is created
-        chroma_path = os.path.join(os.getcwd(), "chroma_db_data") 
-        os.makedirs(chroma_path, exist_ok=True) 
-        db_chroma = chromadb.PersistentClient(path=chroma_path)
-        chroma_collection = db_chroma.get_or_create_collection("arbitragex_documents")
+        # Initialize ChromaDB client and collection: a Chroma server if CHROMA_HOST is set,
+        # otherwise the embedded store in ./chroma_db_data
+        chroma_host = os.getenv("CHROMA_HOST")
+        if chroma_host:
+            db_chroma = chromadb.HttpClient(host=chroma_host, port=int(os.getenv("CHROMA_PORT", "8000")))
+        else:
+            chroma_path = os.path.join(os.getcwd(), "chroma_db_data") 
+            os.makedirs(chroma_path, exist_ok=True) 
+            db_chroma = chromadb.PersistentClient(path=chroma_path)
+        self.chroma_collection = db_chroma.get_or_create_collection("arbitragex_documents")
         
         # Create vector store and storage context
-        self.vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
+        self.vector_store = ChromaVectorStore(chroma_collection=self.chroma_collection)
         self.storage_context = StorageContext.from_defaults(vector_store=self.vector_store)
         
         # Load or build the index from the vector store
@@ -291,8 +329,14 @@ JSON Output:
             documents = [Document(text=text_content, metadata={"document_id": str(document_id)})] # Ensure metadata keys/values are strings if needed by Chroma
             # Parse nodes using global Settings
             nodes = Settings.node_parser.get_nodes_from_documents(documents)
-            # Insert nodes into the index (which uses the persistent Chroma store)
-            self.index.insert_nodes(nodes)
+            # Embed up front (through the cache)
+            texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+            for node, embedding in zip(nodes, await _embed_with_cache(texts)):
+                node.embedding = embedding
+            # Write straight to the Chroma store with explicit embeddings (collection.add(embeddings=...)),
+            # so neither the index nor Chroma computes them again; the index reads from the same store.
+            # The Chroma client is blocking, so the write runs in a worker thread off the event loop
+            await asyncio.to_thread(self.vector_store.add, nodes)
             # Persist changes (Chroma client handles this automatically with PersistentClient)
             # db_chroma.persist() # Not needed with PersistentClient
             
@@ -445,7 +489,7 @@ class OrchestratorAgent:
     async def create_task(self, agent_type, task_type, params):
         """Create and execute a task using the appropriate agent"""
         # Update task status in database
-        from backend.models import AgentTask
+        from .models import AgentTask
         
         task = AgentTask(
             agent_type=agent_type,
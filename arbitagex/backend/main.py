@@ -1,22 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, exists, insert, select, text, update
+from sqlalchemy.orm import Session, selectinload
 import pandas as pd
-import json
+import numpy as np
+import asyncio
+import functools
+import orjson
 import os
+import threading
+import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from . import models, schemas
 from .database import engine, get_db, SessionLocal
-from .agents import OrchestratorAgent
+from .agents import OrchestratorAgent, bulk_store, bulk_store_returning_ids
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Create database tables; set ARBITRAGEX_CREATE_TABLES=0 once they exist to skip the schema
+# introspection round-trips on every import (e.g. each uvicorn --reload)
+if os.getenv("ARBITRAGEX_CREATE_TABLES", "1") == "1":
+    models.Base.metadata.create_all(bind=engine)
 
 # Initialize APIRouter instead of FastAPI app
+# Handlers that use the sync Session are plain `def` so FastAPI runs them in its threadpool
+# rather than blocking the event loop; only handlers that await something stay `async def`.
+# Responses with a response_model are serialized by pydantic-core straight to JSON bytes;
+# don't set a custom default response class (e.g. ORJSONResponse), which opts out of that path.
 router = APIRouter()
 
+# Rows per pandas chunk when importing CSV uploads
+CSV_CHUNK_ROWS = 50_000
+# Refresh planner statistics after a CSV import that created at least this many companies (PostgreSQL)
+CSV_ANALYZE_MIN_ROWS = 10_000
+
+# Run agent tasks on Celery workers (see worker.py) when a broker is configured
+USE_CELERY = bool(os.getenv("CELERY_BROKER_URL"))
+
+class _TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds."""
+
+    def __init__(self, ttl: float, maxsize: int = 4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data))) # Evict the oldest insert
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+# Short-lived caches for the endpoints the UI polls; writers in this process invalidate them,
+# and the TTL bounds staleness for writes made elsewhere (e.g. Celery workers)
+READ_CACHE_TTL = 2.0
+task_status_cache = _TTLCache(READ_CACHE_TTL)
+company_cache = _TTLCache(READ_CACHE_TTL)
+
+# Futures of pending /tasks/{id}/wait long-polls; resolved whenever a task finishes in this process.
+# Tasks finished elsewhere (Celery workers) are picked up by the waiters' periodic recheck.
+_task_waiters: set = set()
+TASK_WAIT_MAX_SECONDS = 30.0
+TASK_WAIT_RECHECK_SECONDS = 1.0
+
+def _notify_task_waiters():
+    for waiter in list(_task_waiters):
+        waiter.get_loop().call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
 # --- Background Task Wrapper --- 
 # This function creates an independent DB session for the background task
 async def run_task_processor(task_id: int):
@@ -38,10 +109,70 @@ async def run_task_processor(task_id: int):
                 task.completed_at = datetime.utcnow()
                 db.commit()
     finally:
+        task_status_cache.invalidate(task_id)
+        company_cache.invalidate() # Storage tasks may have updated company rows
+        _notify_task_waiters()
         if db: # Ensure session is closed if it was opened
             db.close()
+def schedule_task(background_tasks: BackgroundTasks, task_id: int, agent_type: str):
+    """Hand a committed AgentTask to the Celery queue if configured, else to FastAPI BackgroundTasks."""
+    if USE_CELERY:
+        from .worker import enqueue_task # Celery is only needed when a broker is configured
+        enqueue_task(task_id, agent_type)
+    else:
+        background_tasks.add_task(run_task_processor, task_id)
+
+def schedule_tasks(background_tasks: BackgroundTasks, task_ids: List[int], agent_type: str):
+    """Hand a batch of committed AgentTasks of one agent type off for processing.
+    
+    With Celery the whole batch is one broker message, fanned out by a worker, so the
+    request doesn't pay a publish per task.
+    """
+    if USE_CELERY:
+        from .worker import enqueue_tasks
+        enqueue_tasks(task_ids, agent_type)
+    else:
+        for task_id in task_ids:
+            background_tasks.add_task(run_task_processor, task_id)
+
 # --- End Background Task Wrapper ---
 
+def _paginate(query, id_column, response: Response, skip: int, limit: int, after_id: Optional[int]):
+    """Return one page of a list query ordered by id.
+    
+    With after_id the page is found by keyset (WHERE id > after_id) instead of OFFSET,
+    so deep pages cost the same as the first. A full page sets X-Next-Cursor to the
+    after_id for the next request.
+    """
+    query = query.order_by(id_column)
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    elif skip:
+        query = query.offset(skip)
+    items = query.limit(limit).all()
+    if items and len(items) == limit:
+        response.headers["X-Next-Cursor"] = str(items[-1].id)
+    return items
+
+def _stream_rows(db: Session, model, schema, *criteria) -> StreamingResponse:
+    """Stream a model's rows as a JSON array of the schema's fields.
+    
+    Rows are read in batches from a Core select and encoded with orjson, skipping the
+    ORM object and Pydantic model otherwise built per row of an unbounded list. The body
+    reads through the request's get_db session, which FastAPI >= 0.118 keeps open until
+    the response has been sent.
+    """
+    stmt = select(*(model.__table__.c[field] for field in schema.model_fields)).where(*criteria).order_by(model.id)
+    
+    def generate():
+        separator = b"["
+        for row in db.execute(stmt.execution_options(yield_per=1000)).mappings():
+            yield separator + orjson.dumps(dict(row))
+            separator = b","
+        yield b"]" if separator == b"," else b"[]"
+    
+    return StreamingResponse(generate(), media_type="application/json")
+
 # Root endpoint (now relative to router prefix)
 @router.get("/")
 def read_root():
@@ -52,63 +183,74 @@ def read_root():
 def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+# Prometheus scrape endpoint (orchestration poll metrics), if prometheus_client is installed
+@router.get("/metrics")
+def metrics():
+    try:
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    except ImportError:
+        raise HTTPException(status_code=404, detail="Metrics require prometheus_client")
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Company endpoints
 @router.post("/companies/", response_model=schemas.Company)
 def create_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)):
-    db_company = models.Company(**company.dict())
+    # A new company has no links yet; setting the collection up front saves a lazy-load SELECT
+    db_company = models.Company(**company.model_dump(), source_links=[])
     db.add(db_company)
     db.commit()
-    db.refresh(db_company)
     return db_company
 
 @router.get("/companies/", response_model=List[schemas.Company])
 def read_companies(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     name: Optional[str] = None, # Add name query parameter
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Company).filter(
+    # source_links are part of the response: load them for the whole page in one SELECT ... IN
+    query = db.query(models.Company).options(selectinload(models.Company.source_links)).filter(
         ~models.Company.name.startswith("Test Company")
     )
     # Apply name filter if provided (case-insensitive partial match)
     if name:
         query = query.filter(models.Company.name.ilike(f"%{name}%"))
         
-    companies = query.offset(skip).limit(limit).all()
-    return companies
+    return _paginate(query, models.Company.id, response, skip, limit, after_id)
 
 @router.get("/companies/{company_id}", response_model=schemas.Company)
 def read_company(company_id: int, db: Session = Depends(get_db)):
+    cached = company_cache.get(company_id)
+    if cached is not None:
+        return cached
     db_company = db.query(models.Company).filter(models.Company.id == company_id).first()
     if db_company is None:
         raise HTTPException(status_code=404, detail="Company not found")
-    return db_company
+    company = schemas.Company.model_validate(db_company)
+    company_cache.set(company_id, company)
+    return company
 
 # New endpoint to delete all companies named "Test Company"
 @router.delete("/companies/delete-test-companies", status_code=200)
 def delete_test_companies(db: Session = Depends(get_db)):
     """Deletes all company records where the name is exactly 'Test Company'."""
-    # Query for the companies to be deleted
-    companies_to_delete = db.query(models.Company).filter(
-        models.Company.name == "Test Company"
-    ).all()
-    
-    count = len(companies_to_delete)
-    
-    if count == 0:
+    company_ids = select(models.Company.id).where(models.Company.name == "Test Company")
+    # Read-only check first so a no-op call doesn't open a write transaction
+    if not db.scalar(select(exists(company_ids))):
         return {"message": "No companies named 'Test Company' found to delete."}
     
-    deleted_names = []
-    for company in companies_to_delete:
-        deleted_names.append(company.name) # Should all be "Test Company"
-        # Important: Handle related records (FinancialMetric, Person, CompanyEvent, etc.)
-        # if cascade delete is not configured in the database/models.
-        # Simple deletion assuming cascade or no strict foreign keys for now:
-        db.delete(company)
+    # Set-based equivalent of the relationship behaviour on ORM delete:
+    # source links cascade, other child rows are detached (company_id set to NULL)
+    db.execute(delete(models.CompanySourceLink).where(models.CompanySourceLink.company_id.in_(company_ids)))
+    for child in (models.FinancialMetric, models.CompanyEvent, models.Person, models.AnalysisResult):
+        db.execute(update(child).where(child.company_id.in_(company_ids)).values(company_id=None))
+    count = db.execute(delete(models.Company).where(models.Company.name == "Test Company")).rowcount
     
     # Commit the transaction
     db.commit()
+    company_cache.invalidate()
     
     return {
         "message": f"Successfully deleted {count} companies named 'Test Company'."
@@ -117,28 +259,27 @@ def delete_test_companies(db: Session = Depends(get_db)):
 # Investment Strategy endpoints
 @router.post("/strategies/", response_model=schemas.InvestmentStrategy)
 def create_strategy(strategy: schemas.InvestmentStrategyCreate, db: Session = Depends(get_db)):
-    db_strategy = models.InvestmentStrategy(**strategy.dict(exclude={"criteria"}))
+    # The strategy and its criteria are flushed together: one INSERT ... RETURNING for the
+    # strategy, then one batched INSERT for the criteria
+    db_strategy = models.InvestmentStrategy(
+        **strategy.model_dump(exclude={"criteria"}),
+        criteria=[models.StrategyCriteria(**criterion.model_dump()) for criterion in strategy.criteria or []]
+    )
     db.add(db_strategy)
     db.commit()
-    db.refresh(db_strategy)
-    
-    # Add criteria if provided
-    if strategy.criteria:
-        for criterion in strategy.criteria:
-            db_criterion = models.StrategyCriteria(
-                strategy_id=db_strategy.id,
-                **criterion.dict()
-            )
-            db.add(db_criterion)
-        db.commit()
-        db.refresh(db_strategy)
     
     return db_strategy
 
 @router.get("/strategies/", response_model=List[schemas.InvestmentStrategy])
-def read_strategies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    strategies = db.query(models.InvestmentStrategy).offset(skip).limit(limit).all()
-    return strategies
+def read_strategies(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    query = db.query(models.InvestmentStrategy).options(selectinload(models.InvestmentStrategy.criteria))
+    return _paginate(query, models.InvestmentStrategy.id, response, skip, limit, after_id)
 
 @router.get("/strategies/{strategy_id}", response_model=schemas.InvestmentStrategy)
 def read_strategy(strategy_id: int, db: Session = Depends(get_db)):
@@ -154,21 +295,18 @@ def delete_strategies_by_prefix(prefix: str, db: Session = Depends(get_db)):
     if not prefix:
         raise HTTPException(status_code=400, detail="Prefix query parameter is required.")
         
-    # Query for the strategies to be deleted based on the prefix
-    strategies_to_delete = db.query(models.InvestmentStrategy).filter(
-        models.InvestmentStrategy.name.startswith(prefix)
-    ).all()
-    
-    count = len(strategies_to_delete)
-    
-    if count == 0:
+    strategy_filter = models.InvestmentStrategy.name.startswith(prefix)
+    strategy_ids = select(models.InvestmentStrategy.id).where(strategy_filter)
+    if not db.scalar(select(exists(strategy_ids))):
         return {"message": f"No strategies starting with '{prefix}' found to delete."}
     
-    deleted_names = []
-    for strategy in strategies_to_delete:
-        deleted_names.append(strategy.name)
-        # db.query(models.StrategyCriteria).filter(models.StrategyCriteria.strategy_id == strategy.id).delete()
-        db.delete(strategy)
+    # Detach child rows as the ORM delete did, then delete the strategies in one statement
+    for child in (models.StrategyCriteria, models.AnalysisResult):
+        db.execute(update(child).where(child.strategy_id.in_(strategy_ids)).values(strategy_id=None))
+    deleted_names = db.scalars(
+        delete(models.InvestmentStrategy).where(strategy_filter).returning(models.InvestmentStrategy.name)
+    ).all()
+    count = len(deleted_names)
     
     db.commit()
     
@@ -178,121 +316,143 @@ def delete_strategies_by_prefix(prefix: str, db: Session = Depends(get_db)):
     }
 
 # CSV Upload endpoint
+@functools.lru_cache(maxsize=128)
+def _parse_mapping_template(mapping_template: str) -> Dict[str, str]:
+    """Parse a CSV column mapping template, reusing the result for repeated templates (treat as read-only)."""
+    return orjson.loads(mapping_template)
+
+# Unit and time period recorded for each metric column of an uploaded CSV
+_METRIC_UNITS = {'revenue': 'USD', 'growth_rate': '%'}
+_METRIC_PERIODS = {'revenue': 'Latest', 'growth_rate': 'Annual'}
+# Revenue cells such as "5000", "$250K" or "1.5M"
+_REVENUE_RE = r'^\$?\s*(?P<amount>[\d.,]+)\s*(?P<suffix>[KMBkmb])?$'
+_REVENUE_MULTIPLIERS = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+
+def _csv_frame_to_rows(df: pd.DataFrame, source: str):
+    """Turn an uploaded CSV frame into Company row dicts and a FinancialMetric frame keyed by company_index."""
+    if 'name' not in df.columns:
+        return [], pd.DataFrame()
+    df = df.dropna(subset=['name']).reset_index(drop=True)
+    
+    companies = pd.DataFrame({
+        'name': df['name'],
+        'industry': df['industry'] if 'industry' in df.columns else '',
+        'sub_industry': df['sub_industry'] if 'sub_industry' in df.columns else None,
+        'location': df['location'] if 'location' in df.columns else None,
+        'website': df['website'] if 'website' in df.columns else None,
+    })
+    if 'employee_count' in df.columns:
+        companies['employee_count'] = np.trunc(pd.to_numeric(df['employee_count'])).astype('Int64')
+    else:
+        companies['employee_count'] = None
+    # NaN/NA -> None so the rows insert NULLs
+    company_rows = companies.astype(object).where(companies.notna(), None).to_dict('records')
+    
+    # One numeric column per metric type, melted into long form so every metric of the chunk
+    # goes out in a single bulk insert
+    values = pd.DataFrame(index=df.index)
+    if 'revenue' in df.columns:
+        # "$1.5M" -> 1.5 * 1e6; anything that doesn't parse becomes NaN and is dropped
+        parsed = df['revenue'].astype(str).str.strip().str.extract(_REVENUE_RE)
+        amount = pd.to_numeric(parsed['amount'].str.replace(',', '', regex=False), errors='coerce')
+        values['revenue'] = amount * parsed['suffix'].str.upper().map(_REVENUE_MULTIPLIERS).fillna(1.0)
+    if 'growth_rate' in df.columns:
+        values['growth_rate'] = pd.to_numeric(df['growth_rate'].astype(str).str.strip().str.rstrip('%'), errors='coerce')
+    if values.empty:
+        return company_rows, pd.DataFrame()
+    metrics = (
+        values.rename_axis('company_index').reset_index()
+        .melt(id_vars='company_index', var_name='metric_type', value_name='value')
+        .dropna(subset=['value'])
+        .reset_index(drop=True)
+    )
+    metrics['unit'] = metrics['metric_type'].map(_METRIC_UNITS)
+    metrics['time_period'] = metrics['metric_type'].map(_METRIC_PERIODS)
+    metrics['source'] = source
+    return company_rows, metrics
+
 @router.post("/upload/csv/", response_model=schemas.CSVUploadResponse)
-async def upload_csv(
+def upload_csv(
     file: UploadFile = File(...),
     mapping_template: Optional[str] = Form(None),
     db: Session = Depends(get_db)
 ):
-    # Save the uploaded file temporarily
-    file_location = f"/tmp/{file.filename}"
-    with open(file_location, "wb+") as file_object:
-        file_object.write(await file.read())
-    
-    # Parse the CSV file
+    # Parse the upload's spooled file one chunk at a time so memory stays bounded by CSV_CHUNK_ROWS.
+    # The whole import is one transaction: a failing chunk rolls back every row, so a retry starts clean.
     try:
-        df = pd.read_csv(file_location)
-        
-        # Apply mapping template if provided
-        if mapping_template:
-            mapping = json.loads(mapping_template)
-            df = df.rename(columns=mapping)
-        
-        # Process the first 5 rows for preview
-        preview_data = df.head(5).to_dict(orient="records")
-        
-        # Get column names
-        columns = df.columns.tolist()
-        
-        # Process companies from CSV
+        mapping = _parse_mapping_template(mapping_template) if mapping_template else None
+        source = f"CSV Import: {file.filename}"
+        preview_data = []
+        columns = []
+        row_count = 0
         companies_created = 0
-        for _, row in df.iterrows():
-            # Basic validation
-            if 'name' not in row or pd.isna(row['name']):
-                continue
+        is_postgres = db.get_bind().dialect.name == "postgresql"
+        if is_postgres:
+            # Don't wait on the WAL flush for the import's single commit. A crash right after it
+            # can lose the acknowledged upload, but never leaves it half-written.
+            db.execute(text("SET LOCAL synchronous_commit = OFF"))
+        
+        with pd.read_csv(file.file, chunksize=CSV_CHUNK_ROWS) as reader:
+            for df in reader:
+                # Apply mapping template if provided
+                if mapping:
+                    df = df.rename(columns=mapping)
                 
-            # Create company object
-            company_data = {
-                'name': row.get('name', ''),
-                'industry': row.get('industry', ''),
-                'sub_industry': row.get('sub_industry', None),
-                'location': row.get('location', None),
-                'employee_count': int(row.get('employee_count', 0)) if not pd.isna(row.get('employee_count', 0)) else None,
-                'website': row.get('website', None)
-            }
-            
-            # Add to database
-            db_company = models.Company(**company_data)
-            db.add(db_company)
-            companies_created += 1
-            
-            # Add financial metrics if available
-            if 'revenue' in row and not pd.isna(row['revenue']):
-                revenue_data = {
-                    'metric_type': 'revenue',
-                    'value': float(row['revenue'].replace('$', '').replace('M', '000000').replace('K', '000')) 
-                            if isinstance(row['revenue'], str) else float(row['revenue']),
-                    'unit': 'USD',
-                    'time_period': 'Latest',
-                    'source': f"CSV Import: {file.filename}"
-                }
-                db_metric = models.FinancialMetric(company_id=db_company.id, **revenue_data)
-                db.add(db_metric)
+                if row_count == 0:
+                    # Preview and column names come from the first chunk, before any inserts
+                    columns = df.columns.tolist()
+                    preview_data = df.head(5).to_dict(orient="records")
+                row_count += len(df)
+                
+                # Vectorized cleanup; metrics reference their company by position until ids exist
+                company_rows, metrics = _csv_frame_to_rows(df, source)
                 
-            # Add growth rate if available
-            if 'growth_rate' in row and not pd.isna(row['growth_rate']):
-                growth_data = {
-                    'metric_type': 'growth_rate',
-                    'value': float(row['growth_rate'].replace('%', '')) 
-                            if isinstance(row['growth_rate'], str) else float(row['growth_rate']),
-                    'unit': '%',
-                    'time_period': 'Annual',
-                    'source': f"CSV Import: {file.filename}"
-                }
-                db_metric = models.FinancialMetric(company_id=db_company.id, **growth_data)
-                db.add(db_metric)
+                companies_created += len(company_rows)
+                if company_rows:
+                    # Company ids in input order: COPY with reserved ids on PostgreSQL, else INSERT ... RETURNING
+                    company_ids = np.asarray(bulk_store_returning_ids(db, models.Company, company_rows))
+                    if not metrics.empty:
+                        metrics['company_id'] = company_ids[metrics.pop('company_index').to_numpy()]
+                        bulk_store(db, models.FinancialMetric, metrics.to_dict('records'))
+                
+                # Drop this chunk's frames before the reader parses the next one
+                del df, company_rows, metrics
         
-        # Commit all changes
         db.commit()
         
-        # Clean up the temporary file
-        os.remove(file_location)
+        if is_postgres and companies_created >= CSV_ANALYZE_MIN_ROWS:
+            # Large imports skew row estimates until autovacuum catches up
+            db.execute(text("ANALYZE companies, financial_metrics"))
+            db.commit()
         
         return {
             "upload_id": file.filename,
             "status": "success",
-            "row_count": len(df),
+            "row_count": row_count,
             "columns": columns,
             "preview_data": preview_data,
             "companies_created": companies_created
         }
         
     except Exception as e:
-        # Clean up the temporary file
-        if os.path.exists(file_location):
-            os.remove(file_location)
+        db.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to process CSV: {str(e)}")
 
 # Strategy Document Upload endpoint
 @router.post("/upload/strategy/", response_model=schemas.StrategyUploadResponse)
-async def upload_strategy_document(
+def upload_strategy_document(
     file: UploadFile = File(...),
     strategy_name: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    # Save the uploaded file temporarily
-    file_location = f"/tmp/{file.filename}"
-    with open(file_location, "wb+") as file_object:
-        file_object.write(await file.read())
+    # The document itself isn't parsed yet, so it is not copied off the upload's spooled file;
+    # criteria extraction can read file.file directly when it lands
     
     # Create a new strategy
     db_strategy = models.InvestmentStrategy(
         name=strategy_name,
         description=f"Imported from {file.filename}"
     )
-    db.add(db_strategy)
-    db.commit()
-    db.refresh(db_strategy)
     
     # For MVP, we'll just create a document record
     # In a full implementation, we would extract criteria from the document
@@ -301,11 +461,8 @@ async def upload_strategy_document(
         source_type=file.filename.split('.')[-1].lower(),
         content_summary=f"Strategy document for {strategy_name}"
     )
-    db.add(db_document)
-    db.commit()
-    
-    # Clean up the temporary file
-    os.remove(file_location)
+    db.add_all([db_strategy, db_document])
+    db.commit() # Strategy and document in one transaction
     
     return {
         "strategy_id": db_strategy.id,
@@ -317,7 +474,7 @@ async def upload_strategy_document(
 
 # Search endpoints
 @router.post("/search/", response_model=schemas.SearchResponse)
-async def create_search(
+def create_search(
     search: schemas.SearchCreate,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -338,11 +495,9 @@ async def create_search(
     )
     db.add(db_task)
     db.commit()
-    db.refresh(db_query)
-    db.refresh(db_task)
     
     # Use the wrapper function for the background task
-    background_tasks.add_task(run_task_processor, db_task.id)
+    schedule_task(background_tasks, db_task.id, db_task.agent_type)
     
     return {
         "search_id": db_query.id,
@@ -353,57 +508,61 @@ async def create_search(
 
 @router.get("/search/{search_id}/results", response_model=List[schemas.SearchResult])
 def get_search_results(search_id: int, db: Session = Depends(get_db)):
-    results = db.query(models.SearchResult).filter(models.SearchResult.query_id == search_id).all()
-    return results
+    return _stream_rows(db, models.SearchResult, schemas.SearchResult, models.SearchResult.query_id == search_id)
 
 # Endpoint to trigger crawling for unprocessed search results
 @router.post("/tasks/crawl-search-results/{search_id}", status_code=202)
-async def trigger_crawl_tasks_for_search(
+def trigger_crawl_tasks_for_search(
     search_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Finds unprocessed search results for a given search_id and creates crawl tasks."""
-    # Find the original search query
-    search_query = db.query(models.SearchQuery).filter(models.SearchQuery.id == search_id).first()
-    if not search_query:
+    # Check the original search query exists
+    if not db.scalar(select(exists().where(models.SearchQuery.id == search_id))):
         raise HTTPException(status_code=404, detail=f"Search query with ID {search_id} not found.")
         
-    # Find unprocessed search results for this query
-    unprocessed_results = db.query(models.SearchResult).filter(
-        models.SearchResult.query_id == search_id,
-        models.SearchResult.is_processed == False
-    ).all()
+    # Stream the unprocessed results for this query; only their id and url are needed
+    unprocessed_results = db.execute(
+        select(models.SearchResult.id, models.SearchResult.url)
+        .where(models.SearchResult.query_id == search_id, models.SearchResult.is_processed == False)
+        .execution_options(yield_per=1000)
+    )
     
-    if not unprocessed_results:
+    # Build a plain row per result for the WebCrawlerAgent, passing the URL and the
+    # specific SearchResult ID for later updating. Rows go straight to a Core
+    # INSERT ... RETURNING so no ORM objects are tracked in the session.
+    crawl_rows = [
+        {
+            "agent_type": "web_crawler",
+            "task_type": "crawl_url",
+            "status": "pending",
+            "params": {"url": result.url, "search_result_id": result.id},
+        }
+        for result in unprocessed_results
+    ]
+    if not crawl_rows:
         return {"message": f"No unprocessed search results found for search ID {search_id} to crawl."}
-        
-    tasks_created_count = 0
-    for result in unprocessed_results:
-        # Create a new task for the WebCrawlerAgent
-        db_task = models.AgentTask(
-            agent_type="web_crawler",
-            task_type="crawl_url",
-            status="pending",
-            # Pass URL and the specific SearchResult ID for later updating
-            params={"url": result.url, "search_result_id": result.id} 
-        )
-        db.add(db_task)
-        db.commit() # Commit each task individually to get ID immediately
-        db.refresh(db_task)
-        
-        # Schedule the task for processing
-        background_tasks.add_task(run_task_processor, db_task.id)
-        tasks_created_count += 1
+    
+    task_ids = db.scalars(
+        insert(models.AgentTask).returning(models.AgentTask.id, sort_by_parameter_order=True),
+        crawl_rows
+    ).all()
+    db.commit() # One commit for the whole batch
+    
+    # Schedule the tasks for processing
+    schedule_tasks(background_tasks, task_ids, "web_crawler")
+    tasks_created_count = len(task_ids)
         
     return {
         "message": f"Created and initiated {tasks_created_count} crawl tasks for search ID {search_id}.",
-        "tasks_created_count": tasks_created_count
+        "tasks_created_count": tasks_created_count,
+        "crawl_task_ids": task_ids
     }
 
 # Endpoint to trigger information extraction for a completed crawl task
 @router.post("/tasks/extract-from-crawl/{crawl_task_id}", status_code=202)
-async def trigger_extraction_task_for_crawl(
+def trigger_extraction_task_for_crawl(
     crawl_task_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -449,26 +608,83 @@ async def trigger_extraction_task_for_crawl(
     )
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
     
     # Schedule the extraction task
-    background_tasks.add_task(run_task_processor, db_task.id)
+    schedule_task(background_tasks, db_task.id, db_task.agent_type)
     
     return {
         "message": f"Created and initiated information extraction task {db_task.id} based on crawl task {crawl_task_id}.",
         "extraction_task_id": db_task.id
     }
 
+# Batch variant of the endpoint above: one SELECT ... IN and one INSERT for many crawl tasks
+@router.post("/tasks/extract-from-crawls", status_code=202)
+def trigger_extraction_tasks_for_crawls(
+    crawl_task_ids: List[int],
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Triggers extraction tasks for every successful completed crawl task in crawl_task_ids."""
+    if not crawl_task_ids:
+        return {"message": "No crawl task IDs given.", "extraction_task_ids": {}}
+
+    crawl_tasks = db.execute(
+        select(models.AgentTask.id, models.AgentTask.params, models.AgentTask.result)
+        .where(
+            models.AgentTask.id.in_(set(crawl_task_ids)),
+            models.AgentTask.agent_type == "web_crawler",
+            models.AgentTask.task_type == "crawl_url",
+            models.AgentTask.status == "completed"
+        )
+    ).all()
+
+    # Same filtering as the single-task endpoint, minus the per-ID errors
+    crawl_ids = []
+    extraction_rows = []
+    for crawl_task in crawl_tasks:
+        result = crawl_task.result or {}
+        if result.get("status") != "success" or not result.get("extracted_content_snippet"):
+            continue
+        crawl_ids.append(crawl_task.id)
+        extraction_rows.append({
+            "agent_type": "information_extraction",
+            "task_type": "extract_from_content",
+            "status": "pending",
+            "params": {
+                "content": result.get("extracted_content_snippet"),
+                "source_url": result.get("url"),
+                "original_search_result_id": (crawl_task.params or {}).get("search_result_id")
+            }
+        })
+    if not extraction_rows:
+        return {"message": "None of the given crawl tasks have usable content. Skipping extraction.", "extraction_task_ids": {}}
+
+    task_ids = db.scalars(
+        insert(models.AgentTask).returning(models.AgentTask.id, sort_by_parameter_order=True),
+        extraction_rows
+    ).all()
+    db.commit()
+
+    schedule_tasks(background_tasks, task_ids, "information_extraction")
+
+    return {
+        "message": f"Created and initiated {len(task_ids)} information extraction tasks.",
+        # Maps crawl task ID -> extraction task ID; skipped crawl tasks are absent
+        "extraction_task_ids": dict(zip(crawl_ids, task_ids))
+    }
+
 # Endpoint to manually trigger processing for a specific pending task
 @router.post("/tasks/{task_id}/process", status_code=202)
-async def trigger_specific_task_processing(
+def trigger_specific_task_processing(
     task_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Manually triggers the background processing for a specific task ID."""
-    # Find the task
-    task = db.query(models.AgentTask).filter(models.AgentTask.id == task_id).first()
+    # Find the task; only its type and status are needed (not the params/result JSON)
+    task = db.execute(
+        select(models.AgentTask.agent_type, models.AgentTask.status).where(models.AgentTask.id == task_id)
+    ).first()
     if not task:
         raise HTTPException(status_code=404, detail=f"Task ID {task_id} not found.")
         
@@ -477,21 +693,21 @@ async def trigger_specific_task_processing(
         return {"message": f"Task {task_id} is not pending (status: {task.status}). Processing not re-initiated."}
 
     # Schedule the task using the existing background processor
-    background_tasks.add_task(run_task_processor, task.id)
+    schedule_task(background_tasks, task_id, task.agent_type)
     
     return {"message": f"Processing manually triggered for task ID {task_id}. Monitor its status."}
 
 # Endpoint to trigger overview generation and storage for a company
 # Modified to create a master orchestration task
 @router.post("/companies/{company_id}/update-overview", status_code=202)
-async def trigger_company_profile_update(
+def trigger_company_profile_update(
     company_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Creates a master task to generate a full profile (overview, links, financials) for a company."""
-    # 1. Find Company
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
+    # 1. Find Company (only its name is needed)
+    company = db.execute(select(models.Company.name).where(models.Company.id == company_id)).first()
     if not company:
         raise HTTPException(status_code=404, detail=f"Company ID {company_id} not found.")
 
@@ -506,10 +722,9 @@ async def trigger_company_profile_update(
     )
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
     
     # 3. Schedule the master task using the background processor
-    background_tasks.add_task(run_task_processor, db_task.id)
+    schedule_task(background_tasks, db_task.id, db_task.agent_type)
     
     return {
         "message": f"Master task created to generate full profile for Company ID {company_id}. Monitor task status.",
@@ -521,14 +736,16 @@ async def trigger_company_profile_update(
 # 'generate_full_profile' orchestration task rather than being separate.
 # We will leave it for now but recommend merging its goal into the main profile task.
 @router.post("/companies/{company_id}/update-links", status_code=202)
-async def update_company_links(
+def update_company_links(
     company_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Triggers tasks to search for company links (website, linkedin etc.) and store them."""
-    # 1. Find Company
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
+    # 1. Find Company (only its name and website are needed)
+    company = db.execute(
+        select(models.Company.name, models.Company.website).where(models.Company.id == company_id)
+    ).first()
     if not company:
         raise HTTPException(status_code=404, detail=f"Company ID {company_id} not found.")
 
@@ -540,10 +757,6 @@ async def update_company_links(
         status="pending",
         params={"query": search_query_text, "target_entity": company.name, "max_results": 3}
     )
-    db.add(search_task)
-    db.commit()
-    db.refresh(search_task)
-    background_tasks.add_task(run_task_processor, search_task.id)
     
     # --- How to link Search Results back to Link Storage? ---
     # This is complex. Current setup doesn't automatically chain:
@@ -552,13 +765,14 @@ async def update_company_links(
     # In reality, this needs better orchestration.
     
     # --- Simulation: Assume search/crawl/extract found these links ---
+    name_lower = company.name.lower()
     simulated_links = [
-        {"url": f"https://{company.name.lower().replace(' ', '')}.com", "link_type": "website", "description": "Simulated Official Website"},
-        {"url": f"https://linkedin.com/company/{company.name.lower().replace(' ', '-')}", "link_type": "linkedin", "description": "Simulated LinkedIn Profile"}
+        {"url": f"https://{name_lower.replace(' ', '')}.com", "link_type": "website", "description": "Simulated Official Website"},
+        {"url": f"https://linkedin.com/company/{name_lower.replace(' ', '-')}", "link_type": "linkedin", "description": "Simulated LinkedIn Profile"}
     ]
-    if company.website: # Add existing website if present
-         if not any(l['url'] == company.website for l in simulated_links):
-              simulated_links.append({"url": company.website, "link_type": "website", "description": "Existing Website"})
+    simulated_urls = {link["url"] for link in simulated_links}
+    if company.website and company.website not in simulated_urls: # Add existing website if not already simulated
+        simulated_links.append({"url": company.website, "link_type": "website", "description": "Existing Website"})
     # -----------------------------------------------------------------
 
     # 3. Create Task to Store the (Simulated) Links
@@ -569,10 +783,10 @@ async def update_company_links(
         status="pending",
         params={"company_id": company_id, "links": simulated_links, "overwrite": True} 
     )
-    db.add(link_storage_task)
-    db.commit()
-    db.refresh(link_storage_task)
-    background_tasks.add_task(run_task_processor, link_storage_task.id)
+    db.add_all([search_task, link_storage_task])
+    db.commit() # Both tasks in one transaction
+    schedule_task(background_tasks, search_task.id, search_task.agent_type)
+    schedule_task(background_tasks, link_storage_task.id, link_storage_task.agent_type)
 
     return {
         "message": f"Tasks created to find and store links for Company ID {company_id}. Check task statuses.",
@@ -582,39 +796,40 @@ async def update_company_links(
 
 # Endpoint to trigger storage of aggregated extracted data for a company
 @router.post("/tasks/store-aggregated-data/{company_id}", status_code=202)
-async def trigger_storage_for_company(
+def trigger_storage_for_company(
     company_id: int,
     aggregated_data: List[Dict[str, Any]], # Expect a list of extracted_data dicts
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Receives aggregated extracted data and triggers various storage agent tasks."""
-    # 1. Find Company (optional check)
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
-    if not company:
+    # 1. Check the company exists (optional check)
+    if not db.scalar(select(exists().where(models.Company.id == company_id))):
         raise HTTPException(status_code=404, detail=f"Company ID {company_id} not found.")
         
     if not aggregated_data:
          return {"message": "No aggregated data provided. Nothing to store."}
          
     # --- Trigger Storage Tasks --- 
-    storage_task_ids = []
-    overview_to_store = None
-    links_to_store = []
-    metrics_events_payloads = [] # Store payloads for store_extracted_data
+    # One store_extracted_bundle task per source document, so its metrics, events,
+    # link and (for the first source with a summary) overview commit together.
+    bundle_tasks = []
+    overview_assigned = False
     
-    # Consolidate data
     for data_item in aggregated_data:
-        # Prepare payload for metrics/events storage
-        metrics_events_payloads.append({
+        bundle_params = {
             "company_id": company_id,
             "extracted_data": data_item, # Pass the whole item 
-            "source_url": data_item.get("source_url", "Unknown") 
-        })
+            "source_url": data_item.get("source_url", "Unknown"),
+            # Use overwrite=False by default to avoid deleting manually added links?
+            # Or maybe filter links for uniqueness before saving.
+            "overwrite": False
+        }
         
         # Find the best summary/overview (e.g., from the first source)
-        if not overview_to_store and data_item.get("summary"): 
-            overview_to_store = data_item.get("summary")
+        if not overview_assigned and data_item.get("summary"): 
+            bundle_params["overview"] = data_item.get("summary")
+            overview_assigned = True
             
         # Collect potential links (Refine this logic as needed)
         source_url = data_item.get("source_url")
@@ -622,51 +837,20 @@ async def trigger_storage_for_company(
              link_type = "other" # Default
              if "linkedin.com" in source_url: link_type = "linkedin"
              # Add logic to detect website based on company name if needed
-             links_to_store.append({"url": source_url, "link_type": link_type, "description": f"Source: {data_item.get('company_name_mentioned', 'Extracted Data')}"})
-    
-    # Create task for storing Metrics & Events (can be one task per source)
-    for payload in metrics_events_payloads:
-        db_task_metrics_events = models.AgentTask(
-            agent_type="storage",
-            task_type="store_extracted_data",
-            status="pending",
-            params=payload 
-        )
-        db.add(db_task_metrics_events)
-        db.commit()
-        db.refresh(db_task_metrics_events)
-        background_tasks.add_task(run_task_processor, db_task_metrics_events.id)
-        storage_task_ids.append(db_task_metrics_events.id)
-
-    # Create task for storing Overview (if found)
-    if overview_to_store:
-        db_task_overview = models.AgentTask(
-            agent_type="storage",
-            task_type="store_company_overview",
-            status="pending",
-            params={"company_id": company_id, "overview": overview_to_store}
-        )
-        db.add(db_task_overview)
-        db.commit()
-        db.refresh(db_task_overview)
-        background_tasks.add_task(run_task_processor, db_task_overview.id)
-        storage_task_ids.append(db_task_overview.id)
+             bundle_params["links"] = [{"url": source_url, "link_type": link_type, "description": f"Source: {data_item.get('company_name_mentioned', 'Extracted Data')}"}]
         
-    # Create task for storing Links (if any found)
-    if links_to_store:
-        db_task_links = models.AgentTask(
+        db_task_bundle = models.AgentTask(
             agent_type="storage",
-            task_type="store_company_links",
+            task_type="store_extracted_bundle",
             status="pending",
-            # Use overwrite=False by default to avoid deleting manually added links?
-            # Or maybe filter links_to_store for uniqueness before saving.
-            params={"company_id": company_id, "links": links_to_store, "overwrite": False} 
+            params=bundle_params 
         )
-        db.add(db_task_links)
-        db.commit()
-        db.refresh(db_task_links)
-        background_tasks.add_task(run_task_processor, db_task_links.id)
-        storage_task_ids.append(db_task_links.id)
+        bundle_tasks.append(db_task_bundle)
+    
+    db.add_all(bundle_tasks)
+    db.commit() # One commit for all bundles
+    storage_task_ids = [task.id for task in bundle_tasks]
+    schedule_tasks(background_tasks, storage_task_ids, "storage")
         
     return {
         "message": f"Triggered {len(storage_task_ids)} storage sub-tasks for Company ID {company_id}.",
@@ -675,14 +859,13 @@ async def trigger_storage_for_company(
 
 # Analysis endpoints
 @router.post("/analysis/", response_model=schemas.AnalysisResponse)
-async def create_analysis(
+def create_analysis(
     analysis: schemas.AnalysisCreate,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     # Validate strategy exists
-    db_strategy = db.query(models.InvestmentStrategy).filter(models.InvestmentStrategy.id == analysis.strategy_id).first()
-    if db_strategy is None:
+    if not db.scalar(select(exists().where(models.InvestmentStrategy.id == analysis.strategy_id))):
         raise HTTPException(status_code=404, detail="Strategy not found")
 
     # Create agent task for analysis
@@ -697,10 +880,9 @@ async def create_analysis(
     )
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
 
     # Use the wrapper function for the background task
-    background_tasks.add_task(run_task_processor, db_task.id)
+    schedule_task(background_tasks, db_task.id, db_task.agent_type)
 
     return {
         "task_id": db_task.id,
@@ -710,29 +892,21 @@ async def create_analysis(
 
 @router.get("/analysis/results/{strategy_id}", response_model=List[schemas.AnalysisResult])
 def get_analysis_results(strategy_id: int, db: Session = Depends(get_db)):
-    # Simply fetch and return existing results for the strategy ID
-    results = db.query(models.AnalysisResult).filter(models.AnalysisResult.strategy_id == strategy_id).all()
-    
-    return results
+    # Simply stream the existing results for the strategy ID
+    return _stream_rows(db, models.AnalysisResult, schemas.AnalysisResult, models.AnalysisResult.strategy_id == strategy_id)
 
 # New endpoint to delete analysis results for a specific strategy
 @router.delete("/analysis/results/{strategy_id}", status_code=200)
 def delete_analysis_results(strategy_id: int, db: Session = Depends(get_db)):
     """Deletes all analysis results associated with a specific strategy ID."""
-    # Query for the results to be deleted
-    results_to_delete = db.query(models.AnalysisResult).filter(
-        models.AnalysisResult.strategy_id == strategy_id
-    ).all()
-    
-    count = len(results_to_delete)
+    # Delete the results with a single statement
+    count = db.execute(
+        delete(models.AnalysisResult).where(models.AnalysisResult.strategy_id == strategy_id)
+    ).rowcount
     
     if count == 0:
         return {"message": f"No analysis results found for strategy ID {strategy_id} to delete."}
     
-    # Delete each result
-    for result in results_to_delete:
-        db.delete(result)
-    
     # Commit the transaction
     db.commit()
     
@@ -741,17 +915,56 @@ def delete_analysis_results(strategy_id: int, db: Session = Depends(get_db)):
 # Agent task status endpoints
 @router.get("/tasks/{task_id}", response_model=schemas.AgentTask)
 def get_task_status(task_id: int, db: Session = Depends(get_db)):
+    cached = task_status_cache.get(task_id)
+    if cached is not None:
+        return cached
     task = db.query(models.AgentTask).filter(models.AgentTask.id == task_id).first()
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    task_status = schemas.AgentTask.model_validate(task)
+    task_status_cache.set(task_id, task_status)
+    return task_status
+
+def _read_task_status(task_id: int) -> schemas.AgentTask:
+    # Reads the row, not task_status_cache: a Celery worker finishing the task doesn't invalidate
+    # this process's cache, so a cached recheck could lag a full TTL behind the database.
+    # Short-lived session per check so a waiting request doesn't hold a pooled connection
+    with SessionLocal() as db:
+        task = db.query(models.AgentTask).filter(models.AgentTask.id == task_id).first()
+        if task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        task_status = schemas.AgentTask.model_validate(task)
+    task_status_cache.set(task_id, task_status)
+    return task_status
+
+@router.get("/tasks/{task_id}/wait", response_model=schemas.AgentTask)
+async def wait_for_task(task_id: int, timeout: float = 25.0):
+    """Long-poll: returns the task as soon as it is completed or failed, or its current state after timeout seconds."""
+    deadline = time.monotonic() + min(max(timeout, 0.0), TASK_WAIT_MAX_SECONDS)
+    loop = asyncio.get_running_loop()
+    while True:
+        # Register before reading so a task finishing in between still wakes us
+        woken = loop.create_future()
+        _task_waiters.add(woken)
+        try:
+            task_status = await run_in_threadpool(_read_task_status, task_id)
+            remaining = deadline - time.monotonic()
+            if task_status.status in ("completed", "failed") or remaining <= 0:
+                return task_status
+            await asyncio.wait_for(woken, min(remaining, TASK_WAIT_RECHECK_SECONDS))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            _task_waiters.discard(woken)
 
 @router.get("/tasks/", response_model=List[schemas.AgentTask])
 def get_tasks(
+    response: Response,
     agent_type: Optional[str] = None, 
     status: Optional[str] = None,
     skip: int = 0, 
     limit: int = 100, 
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     query = db.query(models.AgentTask)
@@ -762,22 +975,25 @@ def get_tasks(
     if status:
         query = query.filter(models.AgentTask.status == status)
     
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+    return _paginate(query, models.AgentTask.id, response, skip, limit, after_id)
 
 # New endpoint to delete a specific agent task
 @router.delete("/tasks/{task_id}", status_code=200)
 def delete_task(task_id: int, db: Session = Depends(get_db)):
     """Deletes a specific agent task by its ID."""
-    task_to_delete = db.query(models.AgentTask).filter(models.AgentTask.id == task_id).first()
+    # Single DELETE ... RETURNING the fields reported back, instead of loading the task first
+    deleted = db.execute(
+        delete(models.AgentTask).where(models.AgentTask.id == task_id)
+        .returning(models.AgentTask.agent_type, models.AgentTask.task_type, models.AgentTask.status)
+    ).first()
     
-    if not task_to_delete:
+    if not deleted:
         raise HTTPException(status_code=404, detail=f"Agent task with ID {task_id} not found.")
         
-    task_info = f"Task ID {task_id} (Type: {task_to_delete.agent_type}/{task_to_delete.task_type}, Status: {task_to_delete.status})"
+    task_info = f"Task ID {task_id} (Type: {deleted.agent_type}/{deleted.task_type}, Status: {deleted.status})"
     
-    db.delete(task_to_delete)
     db.commit()
+    task_status_cache.invalidate(task_id)
     
     return {"message": f"Successfully deleted task: {task_info}"}
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -143,9 +143,16 @@ class SearchQuery(Base):
 class SearchResult(Base):
     """Model for storing search results."""
     __tablename__ = "search_results"
+    __table_args__ = (
+        # Partial index: only the unprocessed results the crawl trigger looks for
+        Index(
+            "ix_search_results_query_unprocessed", "query_id",
+            postgresql_where=text("is_processed = false"), sqlite_where=text("is_processed = 0")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    query_id = Column(Integer, ForeignKey("search_queries.id"))
+    query_id = Column(Integer, ForeignKey("search_queries.id"), index=True)
     title = Column(String(512))
     url = Column(String(512))
     snippet = Column(Text, nullable=True)
@@ -198,7 +205,7 @@ class AnalysisResult(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"))
-    strategy_id = Column(Integer, ForeignKey("investment_strategies.id"))
+    strategy_id = Column(Integer, ForeignKey("investment_strategies.id"), index=True)
     overall_score = Column(Float)
     explanation = Column(Text)
     score_breakdown = Column(JSON)  # Detailed scoring by criteria
@@ -211,6 +218,9 @@ class AnalysisResult(Base):
 class AgentTask(Base):
     """Model for storing agent tasks."""
     __tablename__ = "agent_tasks"
+    __table_args__ = (
+        Index("ix_agent_tasks_type_status", "agent_type", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     agent_type = Column(String(50))  # search, crawler, extraction, etc.
@@ -1,11 +1,18 @@
 # arbitagex/backend/orchestration.py
 
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
 import logging
 import os
+import httpx
+import orjson
+import random
 import time
-import requests
-import json
-from typing import List, Dict, Any, Type, Optional
+import weakref
+from typing import Any, Callable
 
 from langchain.agents import AgentExecutor, create_react_agent # Example agent type
 from langchain_core.tools import BaseTool, ToolException
@@ -21,14 +28,322 @@ from llama_index.core import Settings
 # from . import models, schemas # If directly accessing DB models/schemas
 # from .database import SessionLocal # If needing direct DB access
 
+# Logging is configured by the host app/script; hot-path messages below use lazy %-style args
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO) # Ensure logging is configured
 
 # --- Constants --- 
 # TODO: Move configuration to a central place or pass it in
 BACKEND_API_BASE_URL = os.getenv("BACKEND_API_BASE_URL", "http://localhost:8080/api")
 POLL_INTERVAL_SECONDS = 5
-MAX_POLL_ATTEMPTS = 12 # 12 * 5s = 60 seconds
+POLL_BUDGET_SECONDS = 60 # Wall-clock limit for waiting on one backend task
+
+# --- Shared HTTP client ---
+# One pooled AsyncClient is reused across tool calls so keep-alive connections to the backend
+# are reused instead of reopened per request. httpx clients are tied to the event loop they run
+# on, so there is one per loop (the sync _run fallback gets its own and closes it when done).
+# HTTP/2 needs the h2 package (httpx[http2]) and a backend that speaks it; uvicorn only serves HTTP/1.1.
+BACKEND_HTTP2 = os.getenv("BACKEND_HTTP2", "").lower() in ("1", "true", "yes")
+_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared backend AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        if BACKEND_HTTP2:
+            # A few multiplexed connections; httpx queues rather than opening more when one hits
+            # the server's stream limit, so spread the fanout over several
+            max_connections = 8
+        else:
+            # HTTP/1.1 carries one request per connection, so size the pool to the semaphores
+            # (see below) that cap in-flight requests; nothing queues in the pool
+            max_connections = POLL_CONCURRENCY + LONG_POLL_CONCURRENCY + TRIGGER_CONCURRENCY
+        client = _http_clients[loop] = httpx.AsyncClient(
+            http2=BACKEND_HTTP2,
+            # Idle connections are dropped just before uvicorn's default 5s keep-alive timeout, so
+            # a request never goes out on a socket the server is closing
+            limits=httpx.Limits(
+                max_keepalive_connections=max_connections, max_connections=max_connections, keepalive_expiry=4.0
+            ),
+            timeout=httpx.Timeout(15.0, connect=5.0, pool=5.0)
+        )
+    return client
+
+async def close_http_client():
+    """Closes the running loop's shared backend client; call when the host shuts the loop down."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+async def _closing_client(coro):
+    # For the sync _run fallbacks: the throwaway loop's client is closed before the loop is
+    try:
+        return await coro
+    finally:
+        await close_http_client()
+
+def _json(response: httpx.Response) -> Any:
+    """Parses a backend response body with orjson straight from bytes (no str decode like response.json())."""
+    return orjson.loads(response.content)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _lacks_wait_endpoint(response: httpx.Response) -> bool:
+    """True if a /tasks/{id}/wait response means the backend has no such route, rather than no such task."""
+    if response.status_code not in (404, 405):
+        return False
+    try:
+        detail = _json(response).get("detail")
+    except (orjson.JSONDecodeError, AttributeError):
+        # Routers and proxies usually answer an unknown route with HTML or plain text
+        return True
+    return detail != "Task not found"
+
+def _json_body(payload: Any) -> bytes:
+    """Serializes a request payload with orjson (bytes out, no str encode like httpx's json=)."""
+    return orjson.dumps(payload)
+
+# --- Retries ---
+RETRY_BASE_SECONDS = 0.5
+RETRY_CAP_SECONDS = 8.0
+MAX_GET_ATTEMPTS = 4
+
+def _backoff_delay(failures: int) -> float:
+    """Exponential backoff with jitter after `failures` consecutive transient errors (1-based)."""
+    return min(RETRY_CAP_SECONDS, RETRY_BASE_SECONDS * 2 ** (failures - 1)) + random.uniform(0, 0.25)
+
+def _is_transient(error: httpx.HTTPError) -> bool:
+    """Network errors, timeouts, 429 and 5xx responses are worth retrying; other HTTP errors are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return True
+
+async def _get_with_backoff(client: httpx.AsyncClient, url: str, max_attempts: int = MAX_GET_ATTEMPTS, **kwargs) -> httpx.Response:
+    """GET that retries transient failures with exponential backoff; raises the last error otherwise."""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            async with _poll_semaphore():
+                response = await client.get(url, **kwargs)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError as e:
+            if attempt == max_attempts or not _is_transient(e):
+                raise
+            delay = _backoff_delay(attempt)
+            logger.warning("GET %s failed (%s); retrying in %.1fs", url, e, delay)
+            await asyncio.sleep(delay)
+
+# --- Backend concurrency limits ---
+# Process-wide caps on in-flight backend requests across all tools and runs, so parallel runs
+# back off here instead of queueing inside httpx's pool or piling onto the backend.
+# Like the clients, semaphores are bound to one event loop, so each loop gets its own.
+POLL_CONCURRENCY = int(os.getenv("ORCH_POLL_CONCURRENCY", "32")) # Task status requests
+# Long polls mostly sit idle on the backend, so they get their own, larger cap instead of
+# holding status-request slots for up to LONG_POLL_SECONDS
+LONG_POLL_CONCURRENCY = int(os.getenv("ORCH_LONG_POLL_CONCURRENCY", "128")) # /tasks/{id}/wait requests
+TRIGGER_CONCURRENCY = int(os.getenv("ORCH_TRIGGER_CONCURRENCY", "8")) # Task-creating POSTs
+_poll_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+_long_poll_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+_trigger_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+def _loop_semaphore(registry: weakref.WeakKeyDictionary, size: int) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = registry.get(loop)
+    if sem is None:
+        sem = registry[loop] = asyncio.Semaphore(size)
+    return sem
+
+def _poll_semaphore() -> asyncio.Semaphore:
+    return _loop_semaphore(_poll_semaphores, POLL_CONCURRENCY)
+
+def _long_poll_semaphore() -> asyncio.Semaphore:
+    return _loop_semaphore(_long_poll_semaphores, LONG_POLL_CONCURRENCY)
+
+def _trigger_semaphore() -> asyncio.Semaphore:
+    return _loop_semaphore(_trigger_semaphores, TRIGGER_CONCURRENCY)
+
+# --- Poll metrics ---
+# Time-to-terminal and retries per task kind, for percentile queries and tuning the poll budget.
+# prometheus_client is optional; without it the instruments are no-ops.
+try:
+    from prometheus_client import Counter, Histogram
+except ImportError:
+    Counter = Histogram = None
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs) -> _NoopMetric:
+        return self
+    def observe(self, value: float) -> None:
+        pass
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+if Histogram is not None:
+    POLL_LATENCY = Histogram(
+        "orch_poll_latency_seconds", "Time from first poll until a backend task is terminal or given up on",
+        ["tool", "outcome"], buckets=(0.5, 1, 2, 5, 10, 20, 30, 60)
+    )
+    POLL_RETRIES = Counter("orch_poll_retries_total", "Transient errors retried while polling backend tasks", ["tool"])
+else:
+    POLL_LATENCY = POLL_RETRIES = _NoopMetric()
+
+# --- Task polling helpers ---
+LONG_POLL_SECONDS = 25 # Per-request wait passed to the backend's /tasks/{id}/wait
+
+async def _poll_until_terminal(client: httpx.AsyncClient, task_id: int, label: str) -> dict[str, Any] | None:
+    """Polls a backend task with no time limit; returns its details once completed/failed, or None on a fatal error.
+    
+    Long-polls /tasks/{id}/wait so it wakes as soon as the task finishes, and falls back to
+    polling /tasks/{id} every POLL_INTERVAL_SECONDS if the backend doesn't have that endpoint.
+    """
+    task_status_url = f"{BACKEND_API_BASE_URL}/tasks/{task_id}"
+    sem = _poll_semaphore()
+    long_poll_sem = _long_poll_semaphore()
+    long_poll = True
+    failures = 0 # Consecutive transient errors, for backoff
+    while True:
+        logger.debug("Polling %s task %s", label, task_id)
+        try:
+            if long_poll:
+                async with long_poll_sem:
+                    response = await client.get(
+                        f"{task_status_url}/wait", params={"timeout": LONG_POLL_SECONDS}, timeout=LONG_POLL_SECONDS + 10
+                    )
+                if _lacks_wait_endpoint(response):
+                    logger.info("Backend has no task wait endpoint; polling %s task %s instead.", label, task_id)
+                    long_poll = False
+                    continue
+            else:
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                async with sem:
+                    response = await client.get(task_status_url, timeout=10)
+            response.raise_for_status()
+            failures = 0
+            task_details = _json(response)
+            status = task_details.get("status")
+            
+            if status == "completed":
+                logger.debug("%s task %s completed.", label.capitalize(), task_id)
+                return task_details
+            elif status == "failed":
+                logger.error("%s task %s failed: %s", label.capitalize(), task_id, task_details.get("error", "Unknown error"))
+                return task_details
+        except httpx.HTTPError as e:
+            if not _is_transient(e):
+                logger.error("API call failed polling %s task %s, not retrying: %s", label, task_id, e)
+                return None
+            failures += 1
+            POLL_RETRIES.labels(tool=label).inc()
+            delay = _backoff_delay(failures)
+            logger.warning("API call failed polling %s task %s, retrying in %.1fs: %s", label, task_id, delay, e)
+            await asyncio.sleep(delay)
+        except Exception as e:
+            logger.error("Unexpected error polling %s task %s: %s", label, task_id, e)
+            return None
+
+async def _poll_task(client: httpx.AsyncClient, task_id: int, label: str) -> dict[str, Any] | None:
+    """Waits for a backend task to complete or fail; returns its details, or None on timeout/error.
+    
+    The whole wait, including slow responses and retries, is bounded by POLL_BUDGET_SECONDS.
+    """
+    logger.debug("Waiting for %s task %s...", label, task_id)
+    start = time.monotonic()
+    try:
+        task_details = await asyncio.wait_for(_poll_until_terminal(client, task_id, label), POLL_BUDGET_SECONDS)
+    except asyncio.TimeoutError:
+        logger.error("Polling timed out for %s task %s after %ss.", label, task_id, POLL_BUDGET_SECONDS)
+        task_details, outcome = None, "timeout"
+    else:
+        outcome = task_details.get("status", "error") if task_details is not None else "error"
+    POLL_LATENCY.labels(tool=label, outcome=outcome).observe(time.monotonic() - start)
+    return task_details
+
+async def _poll_tasks(client: httpx.AsyncClient, task_ids: list[int], label: str) -> list[dict[str, Any] | None]:
+    """Polls all task_ids concurrently; results line up with task_ids (None where polling gave up)."""
+    results = await asyncio.gather(
+        *(_poll_task(client, task_id, label) for task_id in task_ids), return_exceptions=True
+    )
+    return [None if isinstance(result, BaseException) else result for result in results]
+
+async def _trigger_crawl_tasks(client: httpx.AsyncClient, search_query_id: int) -> list[int]:
+    """Triggers backend crawl tasks for a search query's unprocessed results and returns their task IDs."""
+    # The trigger endpoint returns the IDs of the crawl tasks it created
+    trigger_url = f"{BACKEND_API_BASE_URL}/tasks/crawl-search-results/{search_query_id}"
+    try:
+        logger.info(f"Calling POST {trigger_url}")
+        async with _trigger_semaphore():
+            response = await client.post(trigger_url, timeout=15)
+        response.raise_for_status()
+        trigger_response_data = _json(response)
+        tasks_created_count = trigger_response_data.get("tasks_created_count", 0)
+        
+        if tasks_created_count == 0:
+             logger.warning(f"No crawl tasks triggered for search_query_id {search_query_id} (maybe no unprocessed results?).")
+             return [] # Return empty if no tasks created
+             
+        crawl_task_ids = trigger_response_data.get("crawl_task_ids", [])
+        logger.info(f"Triggered {tasks_created_count} crawl tasks for search_query_id {search_query_id}: {crawl_task_ids}")
+        
+    except httpx.HTTPError as e:
+        logger.error(f"API call failed triggering crawl tasks: {e}")
+        raise ToolException(f"Failed to trigger crawl tasks for search_query_id {search_query_id}: {e}") from e
+    except Exception as e:
+         logger.error(f"Unexpected error triggering crawl tasks: {e}")
+         raise ToolException(f"Unexpected error triggering crawl tasks: {e}") from e
+
+    if not crawl_task_ids:
+        logger.error("No crawl task IDs identified. Cannot poll.")
+    return crawl_task_ids
+
+# --- Tool result memoization ---
+TOOL_CACHE_TTL_SECONDS = 3600
+
+class _ToolResultCache:
+    """TTL cache of tool results that also lets concurrent calls for the same key share one run."""
+
+    def __init__(self, ttl: float, maxsize: int = 256, cacheable: Callable[[Any], bool] | None = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.cacheable = cacheable # Optional predicate; results it rejects are returned but not kept
+        self._results: dict[Any, tuple] = {}
+        self._inflight: dict[Any, asyncio.Task] = {}
+
+    async def get_or_run(self, key, factory):
+        entry = self._results.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            logger.info("Reusing cached tool result for %r", key)
+            return entry[1]
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            logger.info("Joining in-flight tool run for %r", key)
+        # Shielded so one caller being cancelled doesn't cancel the run for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return # Failures aren't cached; the next call retries
+        if self.cacheable is not None and not self.cacheable(task.result()):
+            return
+        now = time.monotonic()
+        self._results = {k: v for k, v in self._results.items() if v[0] > now} # Drop expired entries
+        if len(self._results) >= self.maxsize:
+            self._results.pop(next(iter(self._results))) # Evict the oldest insert
+        self._results[key] = (now + self.ttl, task.result())
+
+_search_cache = _ToolResultCache(TOOL_CACHE_TTL_SECONDS)
+_crawl_cache = _ToolResultCache(TOOL_CACHE_TTL_SECONDS)
+# Identical storage payloads for a company (e.g. the agent retrying the step) are only sent once
+# per STORE_DEDUP_TTL_SECONDS; runs where any storage task failed are not remembered
+STORE_DEDUP_TTL_SECONDS = 600
+_store_cache = _ToolResultCache(STORE_DEDUP_TTL_SECONDS, cacheable=lambda result: result[1])
 
 # --- Custom Langchain Tools ---
 
@@ -37,8 +352,13 @@ class SearchCompanyTool(BaseTool):
     description: str = "Initiates a background search task for a company name, polls for completion, and returns a dictionary containing a list of relevant URLs found and the associated search_query_id."
     # args_schema: Type[BaseModel] = ... # Define input schema if needed
 
-    def _run(self, company_name: str, run_manager=None) -> Dict[str, Any]:
-        """Use the tool."""
+    async def _arun(self, company_name: str, run_manager=None) -> dict[str, Any]:
+        """Use the tool. Results are memoized per normalized company name."""
+        key = company_name.strip().lower()
+        return await _search_cache.get_or_run(key, lambda: self._search(company_name))
+
+    async def _search(self, company_name: str) -> dict[str, Any]:
+        client = get_http_client()
         logger.info(f"SearchCompanyTool executing for: {company_name}")
         search_task_id = None
         search_query_id = None
@@ -48,9 +368,10 @@ class SearchCompanyTool(BaseTool):
             create_search_url = f"{BACKEND_API_BASE_URL}/search/"
             payload = {"query": company_name, "target_entity": company_name}
             logger.info(f"Calling POST {create_search_url}")
-            response = requests.post(create_search_url, json=payload, timeout=15)
+            async with _trigger_semaphore():
+                response = await client.post(create_search_url, content=_json_body(payload), headers=JSON_HEADERS, timeout=15)
             response.raise_for_status()
-            search_response_data = response.json()
+            search_response_data = _json(response)
             search_task_id = search_response_data.get("task_id")
             # search_id from the response corresponds to the search_query record ID
             search_query_id = search_response_data.get("search_id") 
@@ -59,51 +380,19 @@ class SearchCompanyTool(BaseTool):
                 raise ToolException(f"Failed to initiate search: API response missing task_id or search_id. Response: {search_response_data}")
             logger.info(f"Search task created (Task ID: {search_task_id}, Search Query ID: {search_query_id})")
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"API call failed during search task creation: {e}")
             raise ToolException(f"Failed to initiate search for {company_name}: {e}") from e
         except Exception as e:
              logger.error(f"Unexpected error during search task creation: {e}")
              raise ToolException(f"Unexpected error initiating search: {e}") from e
              
-        # 2. Poll backend task status
-        task_status_url = f"{BACKEND_API_BASE_URL}/tasks/{search_task_id}"
-        logger.info(f"Polling task status at {task_status_url}")
-        for attempt in range(MAX_POLL_ATTEMPTS):
-            try:
-                time.sleep(POLL_INTERVAL_SECONDS)
-                logger.debug(f"Polling attempt {attempt + 1} for task {search_task_id}...")
-                response = requests.get(task_status_url, timeout=10)
-                response.raise_for_status()
-                task_details = response.json()
-                status = task_details.get("status")
-                
-                if status == "completed":
-                    logger.info(f"Search task {search_task_id} completed.")
-                    # Verify the search_query_id matches if needed
-                    # task_result = task_details.get("result", {})
-                    # confirmed_search_query_id = task_result.get("search_query_id")
-                    # if confirmed_search_query_id != search_query_id:
-                    #     logger.warning("Mismatch in search_query_id!")
-                    break # Exit polling loop
-                elif status == "failed":
-                    error_message = task_details.get("error", "Unknown error")
-                    logger.error(f"Search task {search_task_id} failed: {error_message}")
-                    raise ToolException(f"Backend search task failed: {error_message}")
-                elif attempt + 1 == MAX_POLL_ATTEMPTS:
-                    logger.error(f"Polling timed out for search task {search_task_id}.")
-                    raise ToolException(f"Polling timed out waiting for search task {search_task_id} to complete.")
-                # else status is pending or running, continue polling
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API call failed during task polling: {e}")
-                # Decide whether to retry or fail the tool
-                if attempt + 1 == MAX_POLL_ATTEMPTS:
-                     raise ToolException(f"API error during polling: {e}") from e
-                # Continue polling after transient error
-            except Exception as e:
-                 logger.error(f"Unexpected error during task polling: {e}")
-                 raise ToolException(f"Unexpected error polling task status: {e}") from e
+        # 2. Wait for the backend search task to finish
+        task_details = await _poll_task(client, search_task_id, "search")
+        if task_details is None:
+            raise ToolException(f"Polling timed out waiting for search task {search_task_id} to complete.")
+        if task_details.get("status") == "failed":
+            raise ToolException(f"Backend search task failed: {task_details.get('error', 'Unknown error')}")
         
         # 3. Fetch results
         if search_query_id is None:
@@ -113,9 +402,8 @@ class SearchCompanyTool(BaseTool):
         results_url = f"{BACKEND_API_BASE_URL}/search/{search_query_id}/results"
         logger.info(f"Fetching search results from {results_url}")
         try:
-            response = requests.get(results_url, timeout=15)
-            response.raise_for_status()
-            search_results = response.json()
+            response = await _get_with_backoff(client, results_url, timeout=15)
+            search_results = _json(response)
             
             # 4. Extract URLs
             urls = [result.get("url") for result in search_results if result.get("url")]
@@ -127,18 +415,16 @@ class SearchCompanyTool(BaseTool):
                 "search_query_id": search_query_id
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"API call failed fetching search results: {e}")
             raise ToolException(f"Failed to fetch search results: {e}") from e
         except Exception as e:
              logger.error(f"Unexpected error fetching search results: {e}")
              raise ToolException(f"Unexpected error fetching results: {e}") from e
 
-    async def _arun(self, company_name: str, run_manager=None) -> Dict[str, Any]:
-        """Use the tool asynchronously (Not fully implemented - uses sync logic)."""
-        logger.warning("SearchCompanyTool._arun is using synchronous logic.")
-        # TODO: Implement true async version using httpx and asyncio.sleep
-        return self._run(company_name, run_manager)
+    def _run(self, company_name: str, run_manager=None) -> dict[str, Any]:
+        """Use the tool synchronously (runs the async implementation on a new event loop)."""
+        return asyncio.run(_closing_client(self._arun(company_name)))
 
 class CrawlURLsTool(BaseTool):
     name: str = "crawl_website_urls"
@@ -148,114 +434,38 @@ class CrawlURLsTool(BaseTool):
         "Polls for crawl task completion and returns a list of the task IDs (integer) for successfully completed crawls."
     )
 
-    # Update return type annotation to List[int]
-    def _run(self, search_query_id: int, run_manager=None) -> List[int]:
-        """Use the tool. Input is the search_query_id."""
-        logger.info(f"CrawlURLsTool executing for search_query_id: {search_query_id}")
-        crawl_task_ids = []
-        
-        # 1. Trigger backend crawl tasks
-        trigger_url = f"{BACKEND_API_BASE_URL}/tasks/crawl-search-results/{search_query_id}"
-        try:
-            logger.info(f"Calling POST {trigger_url}")
-            response = requests.post(trigger_url, timeout=15)
-            response.raise_for_status()
-            trigger_response_data = response.json()
-            tasks_created_count = trigger_response_data.get("tasks_created_count", 0)
-            
-            if tasks_created_count == 0:
-                 logger.warning(f"No crawl tasks triggered for search_query_id {search_query_id} (maybe no unprocessed results?).")
-                 return [] # Return empty if no tasks created
-                 
-            logger.info(f"Triggered {tasks_created_count} crawl tasks for search_query_id {search_query_id}. Now finding task IDs...")
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API call failed triggering crawl tasks: {e}")
-            raise ToolException(f"Failed to trigger crawl tasks for search_query_id {search_query_id}: {e}") from e
-        except Exception as e:
-             logger.error(f"Unexpected error triggering crawl tasks: {e}")
-             raise ToolException(f"Unexpected error triggering crawl tasks: {e}") from e
+    async def _arun(self, search_query_id: int, run_manager=None) -> list[int]:
+        """Use the tool. Input is the search_query_id; results are memoized per search_query_id."""
+        return await _crawl_cache.get_or_run(int(search_query_id), lambda: self._crawl(search_query_id))
 
-        # 2. Find the IDs of the created crawl tasks (Fragile - assumes recent tasks)
-        # A better approach would be if the trigger endpoint returned the created task IDs.
-        try:
-            time.sleep(2) # Short delay to allow tasks to appear in list
-            list_tasks_url = f"{BACKEND_API_BASE_URL}/tasks/"
-            list_params = {"agent_type": "web_crawler", "limit": tasks_created_count * 2} # Get more than needed
-            response = requests.get(list_tasks_url, params=list_params, timeout=10)
-            response.raise_for_status()
-            all_tasks = response.json()
-            # Filter tasks potentially related to this search (heuristic based on params)
-            # This is still not robust. Ideally backend links tasks.
-            # We resort to finding the N most recent web_crawler tasks.
-            web_crawler_tasks = [t for t in all_tasks if t.get("agent_type") == "web_crawler"]
-            sorted_tasks = sorted(web_crawler_tasks, key=lambda x: x.get('id', 0), reverse=True)
-            crawl_task_ids = [task.get('id') for task in sorted_tasks[:tasks_created_count] if task.get('id')]
-            logger.info(f"Identified potential crawl task IDs: {crawl_task_ids}")
-            if len(crawl_task_ids) != tasks_created_count:
-                 logger.warning("Could not reliably identify all created crawl task IDs.")
-                 # Proceed with IDs found, but log warning
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API call failed listing tasks to find crawl IDs: {e}")
-            raise ToolException("Failed to find created crawl task IDs.") from e
-        except Exception as e:
-             logger.error(f"Unexpected error finding crawl task IDs: {e}")
-             raise ToolException("Unexpected error finding crawl task IDs.") from e
-             
+    async def _crawl(self, search_query_id: int) -> list[int]:
+        client = get_http_client()
+        logger.info(f"CrawlURLsTool executing for search_query_id: {search_query_id}")
+        # 1. Trigger backend crawl tasks and get their IDs
+        crawl_task_ids = await _trigger_crawl_tasks(client, search_query_id)
         if not crawl_task_ids:
-            logger.error("No crawl task IDs identified. Cannot poll.")
             return []
 
-        # 3. Poll backend task statuses for the identified crawl tasks
+        # 2. Poll backend task statuses for the created crawl tasks concurrently
         successful_crawl_task_ids = [] # Store IDs of successful crawls
         logger.info(f"Polling status for crawl tasks: {crawl_task_ids}")
-        for task_id in crawl_task_ids:
-            task_status_url = f"{BACKEND_API_BASE_URL}/tasks/{task_id}"
-            logger.info(f"Polling task {task_id}...")
-            for attempt in range(MAX_POLL_ATTEMPTS):
-                try:
-                    time.sleep(POLL_INTERVAL_SECONDS)
-                    response = requests.get(task_status_url, timeout=10)
-                    response.raise_for_status()
-                    task_details = response.json()
-                    status = task_details.get("status")
-                    
-                    if status == "completed":
-                        logger.info(f"Crawl task {task_id} completed.")
-                        task_result = task_details.get("result", {})
-                        if task_result.get("status") == "success":
-                            # ** CHANGE: Store ID if successful **
-                            successful_crawl_task_ids.append(task_id)
-                            logger.info(f" -> Success, content length: {task_result.get('content_length')}")
-                        else:
-                             logger.warning(f" -> Failed (Result Status: {task_result.get('status', 'unknown')})")
-                        break # Move to next task ID
-                    elif status == "failed":
-                        error_message = task_details.get("error", "Unknown error")
-                        logger.error(f"Crawl task {task_id} failed: {error_message}")
-                        break # Move to next task ID
-                    elif attempt + 1 == MAX_POLL_ATTEMPTS:
-                        logger.error(f"Polling timed out for crawl task {task_id}.")
-                        break # Move to next task ID
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"API call failed polling task {task_id}: {e}")
-                    if attempt + 1 == MAX_POLL_ATTEMPTS:
-                         logger.error(f"Stopping polling for task {task_id} due to API errors.")
-                         break
-                except Exception as e:
-                     logger.error(f"Unexpected error polling task {task_id}: {e}")
-                     break
+        for task_id, task_details in zip(crawl_task_ids, await _poll_tasks(client, crawl_task_ids, "crawl")):
+            if not task_details or task_details.get("status") != "completed":
+                continue
+            task_result = task_details.get("result") or {}
+            if task_result.get("status") == "success":
+                successful_crawl_task_ids.append(task_id)
+                logger.info(f" -> Crawl task {task_id} succeeded, content length: {task_result.get('content_length')}")
+            else:
+                logger.warning(f" -> Crawl task {task_id} failed (Result Status: {task_result.get('status', 'unknown')})")
                      
-        # 4. Return list of successful crawl task IDs
+        # 3. Return list of successful crawl task IDs
         logger.info(f"CrawlURLsTool finished. Found {len(successful_crawl_task_ids)} successful crawl task IDs: {successful_crawl_task_ids}")
         return successful_crawl_task_ids
 
-    # Modify _arun similarly if implementing async
-    async def _arun(self, search_query_id: int, run_manager=None) -> List[int]: # Update return type
-        """Use the tool asynchronously (Not fully implemented - uses sync logic)."""
-        logger.warning("CrawlURLsTool._arun is using synchronous logic.")
-        return self._run(search_query_id, run_manager)
+    def _run(self, search_query_id: int, run_manager=None) -> list[int]:
+        """Use the tool synchronously (runs the async implementation on a new event loop)."""
+        return asyncio.run(_closing_client(self._arun(search_query_id)))
 
 class ExtractInformationTool(BaseTool):
     name: str = "extract_structured_information"
@@ -265,96 +475,128 @@ class ExtractInformationTool(BaseTool):
         "Polls for extraction task completion and returns a list of the structured data dictionaries extracted by the LLM."
     )
 
-    # Update _run signature to accept List[int]
-    def _run(self, successful_crawl_task_ids: List[int], run_manager=None) -> List[Dict[str, Any]]:
-        """Use the tool. Input is List[crawl_task_id]."""
+    async def _arun(self, successful_crawl_task_ids: list[int], run_manager=None) -> list[dict[str, Any]]:
+        """Use the tool. Input is list[crawl_task_id]."""
+        client = get_http_client()
         if not successful_crawl_task_ids:
             logger.warning("ExtractInformationTool received empty list of crawl task IDs. Skipping extraction.")
             return []
             
         logger.info(f"ExtractInformationTool executing for {len(successful_crawl_task_ids)} successful crawl tasks: {successful_crawl_task_ids}")
-        extraction_task_ids: List[int] = []
-        crawl_to_extraction_map: Dict[int, int] = {} 
+        extraction_task_ids: list[int] = []
+        crawl_to_extraction_map: dict[int, int] = {} 
         
-        # 1. Trigger backend extraction tasks for each successful crawl task ID
+        # 1. Trigger backend extraction tasks for all successful crawl task IDs in one call
         # No need to fetch content here, the backend endpoint handles that
-        for crawl_task_id in successful_crawl_task_ids:
-            trigger_url = f"{BACKEND_API_BASE_URL}/tasks/extract-from-crawl/{crawl_task_id}"
-            try:
-                logger.info(f"Triggering extraction for crawl task {crawl_task_id} via POST {trigger_url}")
-                response = requests.post(trigger_url, timeout=15)
-                response.raise_for_status()
-                trigger_response_data = response.json()
-                new_extraction_task_id = trigger_response_data.get("extraction_task_id")
-                
-                if new_extraction_task_id:
-                    extraction_task_ids.append(new_extraction_task_id)
-                    crawl_to_extraction_map[crawl_task_id] = new_extraction_task_id
-                    logger.info(f" -> Created Extraction Task ID: {new_extraction_task_id}")
-                else:
-                    logger.warning(f"API response missing extraction_task_id for crawl task {crawl_task_id}. Response: {trigger_response_data}")
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API call failed triggering extraction for crawl task {crawl_task_id}: {e}")
-            except Exception as e:
-                 logger.error(f"Unexpected error triggering extraction for crawl task {crawl_task_id}: {e}")
+        trigger_url = f"{BACKEND_API_BASE_URL}/tasks/extract-from-crawls"
+        try:
+            logger.info(f"Triggering extraction for {len(successful_crawl_task_ids)} crawl tasks via POST {trigger_url}")
+            async with _trigger_semaphore():
+                response = await client.post(trigger_url, content=_json_body(successful_crawl_task_ids), headers=JSON_HEADERS, timeout=30)
+            response.raise_for_status()
+            trigger_response_data = _json(response)
+            # JSON object keys come back as strings
+            for crawl_task_id, new_extraction_task_id in trigger_response_data.get("extraction_task_ids", {}).items():
+                extraction_task_ids.append(new_extraction_task_id)
+                crawl_to_extraction_map[int(crawl_task_id)] = new_extraction_task_id
+                logger.info(f" -> Crawl Task {crawl_task_id}: created Extraction Task ID {new_extraction_task_id}")
+            skipped = len(successful_crawl_task_ids) - len(extraction_task_ids)
+            if skipped:
+                logger.warning(f"{skipped} crawl tasks were skipped for extraction. Response: {trigger_response_data.get('message')}")
+        except httpx.HTTPError as e:
+            logger.error(f"API call failed triggering extraction for crawl tasks {successful_crawl_task_ids}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error triggering extraction for crawl tasks {successful_crawl_task_ids}: {e}")
                  
         if not extraction_task_ids:
             logger.error("Failed to trigger any extraction tasks.")
             return []
 
-        # 2. Poll backend task statuses for all triggered extraction tasks
-        aggregated_results: List[Dict[str, Any]] = []
+        # 2. Poll backend task statuses for all triggered extraction tasks concurrently
+        aggregated_results: list[dict[str, Any]] = []
         logger.info(f"Polling status for extraction tasks: {extraction_task_ids}")
-        for task_id in extraction_task_ids:
-            task_status_url = f"{BACKEND_API_BASE_URL}/tasks/{task_id}"
-            logger.info(f"Polling extraction task {task_id}...")
-            for attempt in range(MAX_POLL_ATTEMPTS):
-                try:
-                    time.sleep(POLL_INTERVAL_SECONDS)
-                    response = requests.get(task_status_url, timeout=10)
-                    response.raise_for_status()
-                    task_details = response.json()
-                    status = task_details.get("status")
-                    
-                    if status == "completed":
-                        logger.info(f"Extraction task {task_id} completed.")
-                        task_result = task_details.get("result", {})
-                        if task_result.get("status") == "success":
-                            extracted_data = task_result.get("extracted_data", {}) 
-                            if extracted_data:
-                                 aggregated_results.append(extracted_data)
-                                 logger.info(f" -> Success, retrieved extracted data.")
-                            else:
-                                 logger.warning(f" -> Success, but no extracted_data field in result.")
-                        else:
-                             logger.warning(f" -> Failed (Result Status: {task_result.get('status', 'unknown')})")
-                        break 
-                    elif status == "failed":
-                        error_message = task_details.get("error", "Unknown error")
-                        logger.error(f"Extraction task {task_id} failed: {error_message}")
-                        break 
-                    elif attempt + 1 == MAX_POLL_ATTEMPTS:
-                        logger.error(f"Polling timed out for extraction task {task_id}.")
-                        break 
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"API call failed polling extraction task {task_id}: {e}")
-                    if attempt + 1 == MAX_POLL_ATTEMPTS:
-                         logger.error(f"Stopping polling for task {task_id} due to API errors.")
-                         break
-                except Exception as e:
-                     logger.error(f"Unexpected error polling extraction task {task_id}: {e}")
-                     break
+        for task_id, task_details in zip(extraction_task_ids, await _poll_tasks(client, extraction_task_ids, "extraction")):
+            if not task_details or task_details.get("status") != "completed":
+                continue
+            task_result = task_details.get("result") or {}
+            if task_result.get("status") == "success":
+                extracted_data = task_result.get("extracted_data", {}) 
+                if extracted_data:
+                     aggregated_results.append(extracted_data)
+                     logger.info(f" -> Extraction task {task_id} succeeded, retrieved extracted data.")
+                else:
+                     logger.warning(f" -> Extraction task {task_id} succeeded, but no extracted_data field in result.")
+            else:
+                 logger.warning(f" -> Extraction task {task_id} failed (Result Status: {task_result.get('status', 'unknown')})")
                      
         # 3. Return aggregated list of extracted data dictionaries
         logger.info(f"ExtractInformationTool finished. Aggregated data from {len(aggregated_results)} sources.")
         return aggregated_results
         
-    # Update _arun similarly if implementing async
-    async def _arun(self, successful_crawl_task_ids: List[int], run_manager=None) -> List[Dict[str, Any]]: # Update input type
-        """Use the tool asynchronously (Not fully implemented - uses sync logic)."""
-        logger.warning("ExtractInformationTool._arun is using synchronous logic.")
-        return self._run(successful_crawl_task_ids, run_manager)
+    def _run(self, successful_crawl_task_ids: list[int], run_manager=None) -> list[dict[str, Any]]:
+        """Use the tool synchronously (runs the async implementation on a new event loop)."""
+        return asyncio.run(_closing_client(self._arun(successful_crawl_task_ids)))
+
+async def _crawl_then_extract(client: httpx.AsyncClient, crawl_task_id: int) -> dict[str, Any] | None:
+    """Waits for one crawl task and, if it succeeded, extracts from it right away; returns the extracted data."""
+    crawl_details = await _poll_task(client, crawl_task_id, "crawl")
+    if not crawl_details or crawl_details.get("status") != "completed":
+        return None
+    if (crawl_details.get("result") or {}).get("status") != "success":
+        logger.warning(" -> Crawl task %s finished without usable content; skipping extraction.", crawl_task_id)
+        return None
+    
+    trigger_url = f"{BACKEND_API_BASE_URL}/tasks/extract-from-crawl/{crawl_task_id}"
+    try:
+        async with _trigger_semaphore():
+            response = await client.post(trigger_url, timeout=15)
+        response.raise_for_status()
+        extraction_task_id = _json(response).get("extraction_task_id")
+    except httpx.HTTPError as e:
+        logger.error("API call failed triggering extraction for crawl task %s: %s", crawl_task_id, e)
+        return None
+    if not extraction_task_id:
+        logger.warning("No extraction task created for crawl task %s.", crawl_task_id)
+        return None
+    logger.info(" -> Crawl Task %s: created Extraction Task ID %s", crawl_task_id, extraction_task_id)
+    
+    extraction_details = await _poll_task(client, extraction_task_id, "extraction")
+    if not extraction_details or extraction_details.get("status") != "completed":
+        return None
+    task_result = extraction_details.get("result") or {}
+    if task_result.get("status") != "success" or not task_result.get("extracted_data"):
+        logger.warning(" -> Extraction task %s returned no extracted data (Result Status: %s)", extraction_task_id, task_result.get("status", "unknown"))
+        return None
+    return task_result["extracted_data"]
+
+class CrawlAndExtractTool(BaseTool):
+    name: str = "crawl_and_extract_information"
+    description: str = (
+        "Crawls the URLs found for a search query ID and runs LLM extraction on each page as soon as its crawl finishes. "
+        "Input should be the search_query_id (integer). "
+        "Returns the same list of structured data dictionaries as extract_structured_information, "
+        "usually much faster than calling crawl_website_urls and then extract_structured_information."
+    )
+
+    async def _arun(self, search_query_id: int, run_manager=None) -> list[dict[str, Any]]:
+        """Use the tool. Each URL's extraction starts when its own crawl completes, not after all crawls."""
+        client = get_http_client()
+        logger.info(f"CrawlAndExtractTool executing for search_query_id: {search_query_id}")
+        crawl_task_ids = await _trigger_crawl_tasks(client, search_query_id)
+        if not crawl_task_ids:
+            return []
+        
+        results = await asyncio.gather(
+            *(_crawl_then_extract(client, crawl_task_id) for crawl_task_id in crawl_task_ids),
+            return_exceptions=True
+        )
+        aggregated_results = [result for result in results if result and not isinstance(result, BaseException)]
+        logger.info(f"CrawlAndExtractTool finished. Aggregated data from {len(aggregated_results)} of {len(crawl_task_ids)} URLs.")
+        return aggregated_results
+
+    def _run(self, search_query_id: int, run_manager=None) -> list[dict[str, Any]]:
+        """Use the tool synchronously (runs the async implementation on a new event loop)."""
+        return asyncio.run(_closing_client(self._arun(search_query_id)))
 
 class StoreCompanyDataTool(BaseTool):
     name: str = "store_company_data"
@@ -365,14 +607,24 @@ class StoreCompanyDataTool(BaseTool):
         "Polls storage tasks and returns a final confirmation message."
     )
 
-    # Update input types: company_id and the list of dicts from Extract tool
-    def _run(self, company_id: int, aggregated_data: List[Dict[str, Any]], run_manager=None) -> str:
-        """Use the tool."""
+    async def _arun(self, company_id: int, aggregated_data: list[dict[str, Any]], run_manager=None) -> str:
+        """Use the tool. A payload identical to one already stored for the company is not re-sent."""
         if not aggregated_data:
             logger.warning("StoreCompanyDataTool received empty aggregated_data. Nothing to store.")
             return "No data provided to store."
-            
-        logger.info(f"StoreCompanyDataTool executing for Company ID: {company_id} with data from {len(aggregated_data)} sources.")
+        # Serialized once: the bytes are both the dedup key input and the request body.
+        # Non-cryptographic dedup key; blake2b is fast and sorted keys make it order-insensitive per dict
+        body = orjson.dumps(aggregated_data, option=orjson.OPT_SORT_KEYS)
+        payload_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        result_message, _ = await _store_cache.get_or_run(
+            (int(company_id), payload_hash), lambda: self._store(company_id, len(aggregated_data), body)
+        )
+        return result_message
+
+    async def _store(self, company_id: int, source_count: int, body: bytes) -> tuple:
+        """Triggers and polls the storage tasks for a JSON body; returns (result message, whether every task succeeded)."""
+        client = get_http_client()
+        logger.info(f"StoreCompanyDataTool executing for Company ID: {company_id} with data from {source_count} sources.")
         storage_task_ids = []
 
         # 1. Trigger backend storage tasks via the new endpoint
@@ -380,102 +632,56 @@ class StoreCompanyDataTool(BaseTool):
         try:
             logger.info(f"Calling POST {trigger_url} to trigger storage tasks.")
             # Pass the aggregated data in the request body
-            response = requests.post(trigger_url, json=aggregated_data, timeout=20) 
+            async with _trigger_semaphore():
+                response = await client.post(trigger_url, content=body, headers=JSON_HEADERS, timeout=20)
             response.raise_for_status()
-            trigger_response_data = response.json()
+            trigger_response_data = _json(response)
             storage_task_ids = trigger_response_data.get("storage_task_ids", [])
             
             if not storage_task_ids:
                 logger.warning(f"Backend did not return any storage task IDs for company {company_id}. Data might not be stored.")
-                return "Storage tasks could not be initiated."
+                return "Storage tasks could not be initiated.", False
                  
             logger.info(f"Triggered {len(storage_task_ids)} storage tasks: {storage_task_ids}")
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"API call failed triggering storage tasks: {e}")
             raise ToolException(f"Failed to trigger storage tasks for company {company_id}: {e}") from e
         except Exception as e:
              logger.error(f"Unexpected error triggering storage tasks: {e}")
              raise ToolException(f"Unexpected error triggering storage tasks: {e}") from e
 
-        # 2. Poll backend task statuses for all triggered storage tasks
+        # 2. Poll backend task statuses for all triggered storage tasks concurrently
         completed_count = 0
         failed_count = 0
         logger.info(f"Polling status for storage tasks: {storage_task_ids}")
-        for task_id in storage_task_ids:
-            task_status_url = f"{BACKEND_API_BASE_URL}/tasks/{task_id}"
-            logger.info(f"Polling storage task {task_id}...")
-            for attempt in range(MAX_POLL_ATTEMPTS):
-                try:
-                    time.sleep(POLL_INTERVAL_SECONDS)
-                    response = requests.get(task_status_url, timeout=10)
-                    response.raise_for_status()
-                    task_details = response.json()
-                    status = task_details.get("status")
-                    
-                    if status == "completed":
-                        logger.info(f"Storage task {task_id} completed.")
-                        task_result = task_details.get("result", {})
-                        if task_result.get("status") == "success":
-                            logger.info(f" -> Success: {task_result.get('message')}")
-                            completed_count += 1
-                        else:
-                             logger.warning(f" -> Failed (Result Status: {task_result.get('status', 'unknown')})")
-                             failed_count += 1
-                        break 
-                    elif status == "failed":
-                        error_message = task_details.get("error", "Unknown error")
-                        logger.error(f"Storage task {task_id} failed: {error_message}")
-                        failed_count += 1
-                        break 
-                    elif attempt + 1 == MAX_POLL_ATTEMPTS:
-                        logger.error(f"Polling timed out for storage task {task_id}.")
-                        failed_count += 1 # Count timeout as failure for summary
-                        break 
-                    
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"API call failed polling storage task {task_id}: {e}")
-                    if attempt + 1 == MAX_POLL_ATTEMPTS:
-                         logger.error(f"Stopping polling for task {task_id} due to API errors.")
-                         failed_count += 1
-                         break
-                except Exception as e:
-                     logger.error(f"Unexpected error polling storage task {task_id}: {e}")
-                     failed_count += 1
-                     break
+        for task_id, task_details in zip(storage_task_ids, await _poll_tasks(client, storage_task_ids, "storage")):
+            task_result = (task_details or {}).get("result") or {}
+            if task_details and task_details.get("status") == "completed" and task_result.get("status") == "success":
+                logger.info(f" -> Storage task {task_id} succeeded: {task_result.get('message')}")
+                completed_count += 1
+            else:
+                # Failed tasks, unsuccessful results and timeouts all count as failures for the summary
+                if task_details and task_details.get("status") == "completed":
+                    logger.warning(f" -> Storage task {task_id} failed (Result Status: {task_result.get('status', 'unknown')})")
+                failed_count += 1
                      
         # 3. Return final confirmation message
         result_message = f"""Storage process initiated for Company ID {company_id}. Tasks completed: {completed_count}/{len(storage_task_ids)}. Tasks failed/timed out: {failed_count}.
 Please verify data via company details endpoint."""
         logger.info(result_message)
-        return result_message
+        return result_message, failed_count == 0
         
-    # Update _arun similarly if implementing async
-    async def _arun(self, company_id: int, aggregated_data: List[Dict[str, Any]], run_manager=None) -> str:
-        """Use the tool asynchronously (Not fully implemented - uses sync logic)."""
-        logger.warning("StoreCompanyDataTool._arun is using synchronous logic.")
-        # TODO: Implement true async version using httpx and asyncio.sleep
-        return self._run(company_id, aggregated_data, run_manager)
+    def _run(self, company_id: int, aggregated_data: list[dict[str, Any]], run_manager=None) -> str:
+        """Use the tool synchronously (runs the async implementation on a new event loop)."""
+        return asyncio.run(_closing_client(self._arun(company_id, aggregated_data)))
 
 # --- Orchestration Agent Setup ---
 
-def get_orchestration_agent_executor(llm: BaseLanguageModel) -> AgentExecutor:
-    """Creates and returns the Langchain Agent Executor for orchestration."""
-    # Added type hint for clarity
-    
-    # 1. Instantiate Tools
-    tools = [
-        SearchCompanyTool(),
-        CrawlURLsTool(),
-        ExtractInformationTool(),
-        StoreCompanyDataTool(),
-        # Add GenerateOverviewTool if implemented
-    ]
-
-    # 2. Define Prompt Template (Example using ReAct prompt style)
-    # You might need to customize this significantly
-    # Ensure the prompt clearly defines the goal (generate full profile) and available tools
-    prompt = PromptTemplate.from_template("""
+# The tools and prompt hold no per-run state, so they are built once at import and shared by all runs.
+# Example using ReAct prompt style; you might need to customize this significantly.
+# Ensure the prompt clearly defines the goal (generate full profile) and available tools.
+ORCHESTRATION_PROMPT = PromptTemplate.from_template("""
     You are an assistant designed to research companies and generate comprehensive profiles.
     Your goal is to gather information about a company, extract key details, and store them.
 
@@ -504,29 +710,44 @@ def get_orchestration_agent_executor(llm: BaseLanguageModel) -> AgentExecutor:
     Thought: {agent_scratchpad}
     """)
 
-    # 3. Get LLM - It's now passed directly as an argument
+# A tuple since every cached executor shares it
+ORCHESTRATION_TOOLS = (
+    SearchCompanyTool(),
+    CrawlAndExtractTool(),
+    CrawlURLsTool(),
+    ExtractInformationTool(),
+    StoreCompanyDataTool(),
+    # Add GenerateOverviewTool if implemented
+)
+
+def get_orchestration_agent_executor(llm: BaseLanguageModel) -> AgentExecutor:
+    """Creates and returns the Langchain Agent Executor for orchestration."""
     if llm is None:
-        # This check might be redundant if run_profile_generation ensures it, but good practice
         raise ValueError("LLM instance is required.")
         
-    # 4. Create Agent
     # Example using ReAct agent - other types might be suitable too
-    agent = create_react_agent(llm, tools, prompt)
-
-    # 5. Create Agent Executor
-    agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+    agent = create_react_agent(llm, ORCHESTRATION_TOOLS, ORCHESTRATION_PROMPT)
+    # Intermediate steps would keep every tool observation (crawl/extraction payloads) in the result
+    agent_executor = AgentExecutor(agent=agent, tools=ORCHESTRATION_TOOLS, verbose=True, return_intermediate_steps=False)
 
     logger.info("Orchestration Agent Executor created.")
     return agent_executor
 
+@functools.lru_cache(maxsize=4)
+def get_cached_agent_executor(model_name: str) -> AgentExecutor:
+    """Returns the shared executor (and Langchain Gemini wrapper) for model_name, building it on first use."""
+    # Ensure GOOGLE_API_KEY environment variable is set
+    langchain_llm = ChatGoogleGenerativeAI(model=model_name)
+    logger.info(f"Initialized Langchain LLM wrapper: {type(langchain_llm)}")
+    return get_orchestration_agent_executor(llm=langchain_llm)
+
 # --- Main Orchestration Function ---
 
 async def run_profile_generation(company_id: int, company_name: str):
     """Runs the full profile generation workflow for a given company."""
     logger.info(f"Starting profile generation run for Company ID: {company_id}, Name: {company_name}")
     
-    # --- Get LLM Instance --- 
-    langchain_llm = None
+    # --- Get Agent Executor --- 
     try:
         # Access the globally configured LlamaIndex LLM
         llama_llm = Settings.llm
@@ -537,18 +758,14 @@ async def run_profile_generation(company_id: int, company_name: str):
         model_name = llama_llm.model # Assumes .model attribute holds the name
         logger.info(f"Retrieved LlamaIndex LLM: {type(llama_llm)}, Model: {model_name}")
         
-        # Initialize the Langchain compatible wrapper
-        # Ensure GOOGLE_API_KEY environment variable is set
-        langchain_llm = ChatGoogleGenerativeAI(model=model_name) 
-        logger.info(f"Initialized Langchain LLM wrapper: {type(langchain_llm)}")
+        # The Langchain wrapper and executor are built once per model and reused across runs
+        agent_executor = get_cached_agent_executor(model_name)
         
     except Exception as e:
         logger.error(f"Failed to retrieve/initialize LLM for Langchain: {e}", exc_info=True)
         # TODO: Update central run status tracking (failure)
         return # Stop execution if LLM setup fails
-    # --- End LLM Instance --- 
-        
-    agent_executor = get_orchestration_agent_executor(llm=langchain_llm)
+    # --- End Agent Executor --- 
     
     initial_input = f"Generate a comprehensive profile for the company: {company_name} (ID: {company_id}). Search for information, crawl relevant URLs, extract key data (metrics, events, summary), and store the results."
     
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -22,8 +22,7 @@ class Company(CompanyBase):
     updated_at: datetime
     source_links: List['CompanySourceLink'] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # New Schemas for Company Source Links
 class CompanySourceLinkBase(BaseModel):
@@ -39,8 +38,7 @@ class CompanySourceLink(CompanySourceLinkBase):
     company_id: int
     added_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Financial Metric schemas
 class FinancialMetricBase(BaseModel):
@@ -59,8 +57,7 @@ class FinancialMetric(FinancialMetricBase):
     company_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Person schemas
 class PersonBase(BaseModel):
@@ -79,8 +76,7 @@ class Person(PersonBase):
     company_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Company Event schemas
 class CompanyEventBase(BaseModel):
@@ -99,8 +95,7 @@ class CompanyEvent(CompanyEventBase):
     company_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Strategy Criteria schemas
 class StrategyCriteriaBase(BaseModel):
@@ -118,8 +113,7 @@ class StrategyCriteria(StrategyCriteriaBase):
     strategy_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Investment Strategy schemas
 class InvestmentStrategyBase(BaseModel):
@@ -135,8 +129,7 @@ class InvestmentStrategy(InvestmentStrategyBase):
     updated_at: datetime
     criteria: List[StrategyCriteria] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Document schemas
 class DocumentBase(BaseModel):
@@ -154,8 +147,7 @@ class Document(DocumentBase):
     crawl_date: datetime
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Search schemas
 class SearchCreate(BaseModel):
@@ -180,8 +172,7 @@ class SearchResult(SearchResultBase):
     query_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Analysis schemas
 class AnalysisCreate(BaseModel):
@@ -204,8 +195,7 @@ class AnalysisResult(AnalysisResultBase):
     strategy_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Agent Task schemas
 class AgentTaskBase(BaseModel):
@@ -222,8 +212,7 @@ class AgentTask(AgentTaskBase):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Upload response schemas
 class CSVUploadResponse(BaseModel):
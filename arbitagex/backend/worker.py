@@ -0,0 +1,82 @@
+"""
+Celery worker for running agent tasks outside the web process.
+
+Enabled by setting CELERY_BROKER_URL (e.g. redis://localhost:6379/0); without it the API
+falls back to FastAPI BackgroundTasks. Run I/O-bound and CPU-bound queues separately:
+
+    celery -A arbitagex.backend.worker worker -P threads -c 50 -Q crawl
+    celery -A arbitagex.backend.worker worker -P prefork -c 4 -Q analysis,default
+
+Each task runs its agent with asyncio.run(), so use the prefork or threads pool; eventlet/gevent
+monkey-patching doesn't mix with asyncio.
+
+Tasks are acknowledged late, so a task whose worker died mid-run is re-delivered. Processing is
+idempotent: OrchestratorAgent.process_task only claims a 'pending' task, or a 'running' one whose
+TASK_LEASE_SECONDS lease has expired, and skips completed/failed ones.
+"""
+
+import asyncio
+import os
+
+from celery import Celery
+from celery.signals import worker_process_init
+
+from .agents import TASK_LEASE_SECONDS
+from .database import engine
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+
+celery_app = Celery("arbitagex", broker=CELERY_BROKER_URL)
+celery_app.conf.task_default_queue = "default"
+# Re-deliver a task if the worker dies mid-run instead of losing it
+celery_app.conf.task_acks_late = True
+# The broker re-delivers unacknowledged tasks after this long, the same lease after which
+# process_task treats a 'running' task as crashed; keep it above the longest task's runtime
+celery_app.conf.broker_transport_options = {"visibility_timeout": TASK_LEASE_SECONDS}
+
+# Queue per agent type: network-bound agents share the high-concurrency crawl pool
+TASK_QUEUES = {
+    "search": "crawl",
+    "web_crawler": "crawl",
+    "information_extraction": "crawl",
+    "analysis": "analysis",
+}
+
+
+@worker_process_init.connect
+def _reset_db_pool(**kwargs):
+    """Drop pooled connections inherited from the parent so forked workers open their own."""
+    engine.dispose(close=False)
+
+
+@worker_process_init.connect
+def _warm_agent_clients(**kwargs):
+    """Build the shared agent clients once per worker process instead of on its first task."""
+    from .agents import get_information_extractor, get_tavily_client
+    get_tavily_client()
+    get_information_extractor()
+
+
+@celery_app.task(name="arbitagex.process_task")
+def process_task_celery(task_id: int):
+    """Process an AgentTask by id with its own DB session."""
+    from .main import run_task_processor # Deferred: main imports this module lazily too
+    asyncio.run(run_task_processor(task_id))
+
+
+def enqueue_task(task_id: int, agent_type: str):
+    """Send an AgentTask to the queue for its agent type."""
+    process_task_celery.apply_async(args=[task_id], queue=TASK_QUEUES.get(agent_type, "default"))
+
+
+@celery_app.task(name="arbitagex.fan_out_tasks")
+def fan_out_tasks_celery(task_ids: list, agent_type: str):
+    """Enqueue each AgentTask of a batch on its agent type's queue."""
+    for task_id in task_ids:
+        enqueue_task(task_id, agent_type)
+
+
+def enqueue_tasks(task_ids: list, agent_type: str):
+    """Send a batch of AgentTasks as one message; a worker fans it out."""
+    if task_ids:
+        fan_out_tasks_celery.apply_async(args=[task_ids, agent_type], queue="default")
@@ -55,7 +55,11 @@ const ApiClient = {
     },
 
     // Companies endpoints
-    async getCompanies(skip = 0, limit = 100) {
+    // Pass afterId (the X-Next-Cursor of the previous page) to page by keyset instead of skip
+    async getCompanies(skip = 0, limit = 100, afterId = null) {
+        if (afterId !== null) {
+            return await this.get(`/api/companies/?after_id=${afterId}&limit=${limit}`);
+        }
         return await this.get(`/api/companies/?skip=${skip}&limit=${limit}`);
     },
 
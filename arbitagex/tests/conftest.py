@@ -0,0 +1,86 @@
+"""Shared pytest fixtures for the ArbitrageX test suite."""
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture(scope="session")
+def patched_chroma():
+    """Replaces chromadb.PersistentClient for the whole session; yields the mock client class.
+
+    A session-scoped MonkeyPatch keeps one patch in place across tests instead of
+    re-entering a patch() context in every setup.
+    """
+    mock_client_cls = MagicMock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("chromadb.PersistentClient", mock_client_cls)
+        yield mock_client_cls
+
+
+def _sqlite_manual_transactions(dbapi_connection, connection_record):
+    # pysqlite's own BEGIN handling breaks SAVEPOINTs; let SQLAlchemy emit BEGIN itself
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """In-memory SQLite engine for the API tests; the schema is created once per session.
+
+    StaticPool hands every checkout (from any thread) the same connection, so the one
+    in-memory database is shared by the tests, the app's threadpool and background tasks.
+    """
+    import orjson
+    from arbitagex.backend import models
+    from arbitagex.backend.database import _json_serializer
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+        json_serializer=_json_serializer, json_deserializer=orjson.loads
+    )
+    event.listen(engine, "connect", _sqlite_manual_transactions)
+    event.listen(engine, "begin", _sqlite_begin)
+    models.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_connection(db_engine):
+    """Runs a test inside one outer transaction that is rolled back afterwards.
+
+    SessionLocal (and so get_db and background tasks) is bound to the connection with session
+    commits turned into SAVEPOINT releases, so per-test cleanup is a single ROLLBACK.
+    """
+    from arbitagex.backend.database import SessionLocal
+
+    app_bind = SessionLocal.kw["bind"]
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield connection
+    finally:
+        SessionLocal.configure(bind=app_bind, join_transaction_mode="conservative_savepoint")
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+async def aclient():
+    """Async httpx client that calls the app in-process on the test's event loop.
+
+    Unlike TestClient there is no worker thread per request. ASGITransport doesn't send
+    lifespan events, so app startup (DB ping, Gemini setup) is skipped.
+    """
+    import httpx
+    from run import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
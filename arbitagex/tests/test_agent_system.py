@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import os
-import sys
 import unittest
 import time
 import asyncio
@@ -8,12 +7,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 # Import backend modules
-from backend import models
-from backend.agents import (
+from arbitagex.backend import models
+from arbitagex.backend.agents import (
     OrchestratorAgent,
     DataIngestionAgent,
     SearchAgent,
@@ -22,20 +18,23 @@ from backend.agents import (
     AnalysisAgent,
     StorageAgent
 )
-from backend.database import SessionLocal, engine, Base
+from arbitagex.backend.database import SessionLocal, engine, Base
 
 class TestAgentSystem(unittest.TestCase):
     """Test suite for ArbitrageX agent system"""
     
     @classmethod
     def setUpClass(cls):
-        """Create database tables before tests"""
+        """Create database tables and the shared event loop before tests"""
         # Ensure tables are created (idempotent)
         Base.metadata.create_all(bind=engine)
+        # One shared event loop for the class instead of an asyncio.run() per agent call
+        cls.loop = asyncio.new_event_loop()
 
     @classmethod
     def tearDownClass(cls):
-        """Drop database tables after tests"""
+        """Drop database tables and close the event loop after tests"""
+        cls.loop.close()
         # Drop all tables
         Base.metadata.drop_all(bind=engine)
 
@@ -56,7 +55,7 @@ class TestAgentSystem(unittest.TestCase):
         orchestrator = OrchestratorAgent(self.db)
         
         # Test task creation
-        task_id = asyncio.run(orchestrator.create_task(
+        task_id = self.loop.run_until_complete(orchestrator.create_task(
             agent_type="search",
             task_type="web_search",
             params={"query": "test query", "target_entity": "test company"}
@@ -75,7 +74,7 @@ class TestAgentSystem(unittest.TestCase):
         agent = DataIngestionAgent(self.db)
         
         # Test process_csv method
-        result = asyncio.run(agent.process_csv({
+        result = self.loop.run_until_complete(agent.process_csv({
             "file_path": "test.csv",
             "mapping": {"name": "company_name", "industry": "sector"}
         }))
@@ -92,7 +91,7 @@ class TestAgentSystem(unittest.TestCase):
         self.db.refresh(dummy_query)
 
         # Test web_search method
-        result = asyncio.run(agent.web_search({
+        result = self.loop.run_until_complete(agent.web_search({
             "query": "test query",
             "target_entity": "test company"
         }))
@@ -105,7 +104,7 @@ class TestAgentSystem(unittest.TestCase):
         agent = WebCrawlerAgent(self.db)
         
         # Test crawl_url method
-        result = asyncio.run(agent.crawl_url({
+        result = self.loop.run_until_complete(agent.crawl_url({
             "url": "https://example.com/test",
             "query_id": 1
         }))
@@ -123,7 +122,7 @@ class TestAgentSystem(unittest.TestCase):
         self.db.refresh(dummy_doc) # Refresh to get the assigned ID
         
         # Test extract_information method using the assigned ID
-        result = asyncio.run(agent.extract_information({
+        result = self.loop.run_until_complete(agent.extract_information({
             "document_id": dummy_doc.id, 
             "content": "<html><body><p>Test company with $45M revenue and 22% growth.</p></body></html>"
         }))
@@ -135,7 +134,7 @@ class TestAgentSystem(unittest.TestCase):
         agent = AnalysisAgent(self.db)
         
         # Test analyze_companies method
-        result = asyncio.run(agent.analyze_companies({
+        result = self.loop.run_until_complete(agent.analyze_companies({
             "strategy_id": 1,
             "filters": {"industry": "Technology"}
         }))
@@ -147,7 +146,7 @@ class TestAgentSystem(unittest.TestCase):
         agent = StorageAgent(self.db)
         
         # Test store_document_vectors method
-        result = asyncio.run(agent.store_document_vectors({
+        result = self.loop.run_until_complete(agent.store_document_vectors({
             "document_id": 1,
             "text_content": "This is a test document for vector storage."
         }))
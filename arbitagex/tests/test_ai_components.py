@@ -1,18 +1,16 @@
 #!/usr/bin/env python3
 import os
-import sys
 import unittest
 import time
-
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
 
 # Import backend modules
-from backend.ai_components import (
+from arbitagex.backend.ai_components import (
     TextProcessor,
     InformationExtractor,
     CompanyProfileGenerator,
     SimilarityCalculator,
+    EmbeddingMatrix,
     CompanyScorer
 )
 
@@ -36,8 +34,11 @@ class TestAIComponents(unittest.TestCase):
         self.assertNotIn("123", cleaned)
         self.assertNotIn("@#$%", cleaned)
         
-        # Skip tokenize test due to NLTK resource issues in test environment
-        # This would be properly tested in a production environment
+        # Test tokenize (regex splitter, no NLTK data needed for multi-sentence text)
+        sentences = self.text_processor.tokenize("Revenue grew 20%. The company hired a CFO! Is it profitable? \"Yes,\" they said.")
+        self.assertEqual(len(sentences), 4)
+        self.assertEqual(sentences[0], "Revenue grew 20%.")
+        self.assertEqual(self.text_processor.tokenize("One short sentence"), ["One short sentence"])
         
         # Test chunk_text with simple approach that doesn't require tokenization
         long_text = " ".join(["Sentence number " + str(i) + "." for i in range(50)])
@@ -54,6 +55,17 @@ class TestAIComponents(unittest.TestCase):
         
         self.assertGreater(len(chunks), 1)
     
+    def test_chunk_text_overlap(self):
+        """Test chunking carries trailing sentences into the next chunk"""
+        long_text = " ".join("Sentence number " + str(i) + "." for i in range(50))
+        chunks = self.text_processor.chunk_text(long_text, chunk_size=100, overlap=40)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 100)
+        for prev, nxt in zip(chunks, chunks[1:]):
+            last_sentence = prev.rsplit(". ", 1)[-1]
+            self.assertIn(last_sentence, nxt)
+    
     def test_information_extractor(self):
         """Test information extraction"""
         # Test financial metrics extraction
@@ -122,6 +134,38 @@ class TestAIComponents(unittest.TestCase):
         self.assertLess(similarities[1], 1)
         self.assertGreater(similarities[1], 0)
         self.assertEqual(similarities[2], 0)
+        
+        # Batch and pairwise scores agree to float64 rounding, so rankings don't depend on the API used
+        rng = np.random.default_rng(0)
+        query_vec = rng.standard_normal(64).tolist()
+        vectors = rng.standard_normal((20, 64)).tolist()
+        batch = self.similarity_calculator.batch_cosine_similarity(query_vec, vectors)
+        for vec, score in zip(vectors, batch):
+            self.assertAlmostEqual(score, self.similarity_calculator.cosine_similarity(query_vec, vec), places=12)
+        
+        # NumPy inputs are accepted like lists
+        array_batch = self.similarity_calculator.batch_cosine_similarity(np.array(query_vec), np.array(vectors))
+        self.assertEqual(array_batch, batch)
+        self.assertEqual(self.similarity_calculator.batch_cosine_similarity(np.array([]), [[1.0]]), [0.0])
+        
+        # Test half-precision embedding matrix
+        query_vec = [1, 0, 0, 0]
+        vectors = [
+            [1, 0, 0, 0],
+            [0.5, 0.5, 0, 0],
+            [0, 1, 0, 0]
+        ]
+        matrix = EmbeddingMatrix(vectors)
+        self.assertEqual(len(matrix), 3)
+        similarities = self.similarity_calculator.batch_cosine_similarity(query_vec, matrix)
+        self.assertAlmostEqual(similarities[0], 1, places=3)
+        self.assertAlmostEqual(similarities[1], 0.7071, places=3)
+        self.assertEqual(similarities[2], 0)
+        
+        # The caller's query array is left as it was
+        query_arr = np.array([1, 0, 0, 0], dtype=np.float32) * 3
+        matrix.cosine_similarity(query_arr)
+        np.testing.assert_array_equal(query_arr, np.array([3, 0, 0, 0], dtype=np.float32))
     
     def test_company_scorer(self):
         """Test company scoring"""
@@ -157,6 +201,12 @@ class TestAIComponents(unittest.TestCase):
         self.assertIn("revenue_match", score_result["score_breakdown"])
         self.assertIn("growth_match", score_result["score_breakdown"])
         self.assertIn("location_match", score_result["score_breakdown"])
+        
+        # Batch scoring agrees with the per-company path
+        other_profile = {"name": "BioCo", "industry": "Biotech", "financial_metrics": {"revenue": 5}}
+        batch_scores = self.company_scorer.score_companies_batch([company_profile, other_profile], strategy_criteria)
+        self.assertAlmostEqual(batch_scores[0], score_result["overall_score"])
+        self.assertAlmostEqual(batch_scores[1], self.company_scorer.score_company(other_profile, strategy_criteria)["overall_score"])
 
 if __name__ == "__main__":
     unittest.main()
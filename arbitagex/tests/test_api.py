@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import os
-import sys
 import unittest
 import requests
 import json
@@ -8,9 +7,6 @@ import time
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock, MagicMock
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 # Import the main app from run.py AFTER setting env vars if needed
 # Load environment variables (optional here, but good practice)
 from dotenv import load_dotenv
@@ -19,7 +15,7 @@ if not os.environ.get("GOOGLE_API_KEY"):
     os.environ["GOOGLE_API_KEY"] = "dummy_test_key_google"
 
 from run import app # Import the main app from run.py
-from backend.database import Base, engine
+from arbitagex.backend.database import Base, engine
 
 # Create test client using the main app
 client = TestClient(app)
@@ -144,8 +140,8 @@ class TestArbitrageXAPI(unittest.TestCase):
         self.assertIn("task_id", data)
     
     # Mock LlamaIndexOrchestrator methods for agent endpoint tests
-    @patch('backend.llamaindex_agents.LlamaIndexOrchestrator.extract_information', new_callable=AsyncMock)
-    @patch('backend.agent_api.profile_generator') # Patch the instance variable itself
+    @patch('arbitagex.backend.llamaindex_agents.LlamaIndexOrchestrator.extract_information', new_callable=AsyncMock)
+    @patch('arbitagex.backend.agent_api.profile_generator') # Patch the instance variable itself
     @patch('llama_index.embeddings.gemini.GeminiEmbedding.get_text_embedding')
     def test_agent_endpoints(self, mock_get_embedding, mock_profile_generator_instance, mock_extract_info):
         """Test agent-specific endpoints with mocked backend logic"""
@@ -1,31 +1,48 @@
 #!/usr/bin/env python3
 import os
 import uvicorn
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
+from sqlalchemy import text
 
 # Import backend routers
 from arbitagex.backend.main import router as main_router
 from arbitagex.backend.agent_api import router as agent_router
 from arbitagex.backend.llamaindex_integration import router as llamaindex_router
-from arbitagex.backend.database import engine, Base # For table creation
+from arbitagex.backend.database import engine # For the startup connectivity check
 
 # --- LlamaIndex Global Settings --- 
 from llama_index.core import Settings
-from llama_index.llms.gemini import Gemini
-from llama_index.embeddings.gemini import GeminiEmbedding # Or your chosen embedding
 
 # Create main FastAPI app
 app = FastAPI(title="ArbitrageX - Combined API")
 
-# Create database tables on startup (optional)
 load_dotenv()
 
+def configure_llm():
+    """Configures the global LlamaIndex LLM; done at startup so importing this module stays cheap."""
+    from llama_index.llms.gemini import Gemini
+    # from llama_index.embeddings.gemini import GeminiEmbedding # Or your chosen embedding
+    print("Configuring global LlamaIndex settings...")
+    # UPDATE: Use the specific Gemini 1.5 Pro model identifier requested
+    Settings.llm = Gemini(model_name="models/gemini-2.5-pro-preview-03-25") 
+    # Optionally configure embeddings globally too
+    # Settings.embed_model = GeminiEmbedding(model_name="models/embedding-001") 
+    # Access model name via .model attribute
+    print(f"LLM set to: {type(Settings.llm)} with model name: {Settings.llm.model}") 
+    # print(f"Embedding model set to: {type(Settings.embed_model)}")
+
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    # One connectivity check up front, since the pool doesn't pre-ping on checkout
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    # Tables are created when arbitagex.backend.main is imported (see ARBITRAGEX_CREATE_TABLES)
+    # Tests (and tools that only need the routes) skip the Gemini client setup
+    if os.getenv("ARBITRAGEX_SKIP_LLM_INIT") != "1":
+        configure_llm()
 
 # Configure CORS (Apply to main app)
 app.add_middleware(
@@ -34,23 +51,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor on list endpoints
 )
 
-# Configure LlamaIndex settings globally BEFORE importing other modules
-print("Configuring global LlamaIndex settings...")
-# UPDATE: Use the specific Gemini 1.5 Pro model identifier requested
-Settings.llm = Gemini(model_name="models/gemini-2.5-pro-preview-03-25") 
-# Optionally configure embeddings globally too
-# Settings.embed_model = GeminiEmbedding(model_name="models/embedding-001") 
-# Access model name via .model attribute
-print(f"LLM set to: {type(Settings.llm)} with model name: {Settings.llm.model}") 
-# print(f"Embedding model set to: {type(Settings.embed_model)}")
-# --- End LlamaIndex Global Settings ---
-
-# Include backend routers with prefix
-app.include_router(main_router, prefix="/api")
-app.include_router(agent_router, prefix="/api") # agent_router already has /agents prefix internally
-app.include_router(llamaindex_router, prefix="/api") # llamaindex_router already has /llamaindex prefix internally
+# Compose the backend routers under one /api router so the app includes them in a single pass
+api_router = APIRouter(prefix="/api")
+api_router.include_router(main_router)
+api_router.include_router(agent_router) # agent_router already has /agents prefix internally
+api_router.include_router(llamaindex_router) # llamaindex_router already has /llamaindex prefix internally
+app.include_router(api_router)
 
 # Mount static files for frontend at the root path
 # Ensure this path is correct relative to where run.py is executed